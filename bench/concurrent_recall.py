@@ -0,0 +1,77 @@
+"""
+Mixes continuous ingest with N parallel recall threads against a FAISSVectorStore.
+
+    python -m synth_memory.bench.concurrent_recall --rows 20000 --readers 1 4 8
+
+`--baseline-lock` funnels every search and add (including its disk write) through one
+mutex, which reproduces the store's behaviour before snapshot-isolated reads.
+"""
+import argparse
+import contextlib
+import tempfile
+import threading
+import time
+import numpy as np
+from datetime import datetime
+from pathlib import Path
+from ..store.vector_store import FAISSVectorStore
+
+def _run(store: FAISSVectorStore, dim: int, readers: int, duration: float, gate) -> dict:
+    rng = np.random.default_rng(readers)
+    stop = threading.Event()
+    latencies, ingested = [], [0]
+
+    def recall():
+        local = []
+        q = rng.random(dim, dtype='float32')
+        while not stop.is_set():
+            start = time.perf_counter()
+            with gate: store.search(q, k=10)
+            local.append(time.perf_counter() - start)
+        latencies.extend(local)
+
+    def ingest():
+        while not stop.is_set():
+            vec = rng.random((1, dim), dtype='float32')
+            with gate: store.add(vec, [{"id": f"i{ingested[0]}", "text": "x", "mode": "bench", "ts": datetime.now().isoformat()}])
+            ingested[0] += 1
+
+    threads = [threading.Thread(target=recall) for _ in range(readers)] + [threading.Thread(target=ingest)]
+    for t in threads: t.start()
+    time.sleep(duration)
+    stop.set()
+    for t in threads: t.join()
+    lat = np.array(latencies) * 1000.0
+    return {
+        "qps": len(lat) / duration,
+        "p50_ms": float(np.percentile(lat, 50)) if lat.size else 0.0,
+        "p99_ms": float(np.percentile(lat, 99)) if lat.size else 0.0,
+        "ingest_per_s": ingested[0] / duration,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="SynthMemory concurrent recall benchmark")
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--readers", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--baseline-lock", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = FAISSVectorStore(Path(tmp), dimension=args.dim)
+        rng = np.random.default_rng(0)
+        now = datetime.now().isoformat()
+        for start in range(0, args.rows, 4096):
+            n = min(4096, args.rows - start)
+            store.add(rng.random((n, args.dim), dtype='float32'), [{"id": str(start + i), "text": "x", "mode": "bench", "ts": now} for i in range(n)])
+
+        gate = threading.Lock() if args.baseline_lock else contextlib.nullcontext()
+        mode = "baseline-lock" if args.baseline_lock else "snapshot"
+        print(f"mode={mode} rows={args.rows} dim={args.dim} duration={args.duration}s")
+        for readers in args.readers:
+            r = _run(store, args.dim, readers, args.duration, gate)
+            print(f"readers={readers:<3} recall_qps={r['qps']:9.1f}  p50={r['p50_ms']:7.2f}ms  p99={r['p99_ms']:7.2f}ms  ingest={r['ingest_per_s']:7.1f}/s")
+
+if __name__ == "__main__":
+    main()
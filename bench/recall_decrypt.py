@@ -0,0 +1,50 @@
+"""
+Measures the decryption overhead that envelope encryption adds to the recall path.
+
+    python -m synth_memory.bench.recall_decrypt --rows 20000 --k 5 10 20
+"""
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+from ..utils.encryption import NamespaceKeyring
+
+def _timeit(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat): fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description="SynthMemory recall decryption benchmark")
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--k", type=int, nargs="+", default=[5, 10, 20])
+    parser.add_argument("--namespaces", type=int, default=4)
+    parser.add_argument("--text-len", type=int, default=400)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        keyring = NamespaceKeyring(Path(tmp) / "keys.json", cache_size=args.namespaces)
+        text = "x" * args.text_len
+        plain, sealed = [], []
+        for i in range(args.rows):
+            ns = f"mode{i % args.namespaces}"
+            kid, token = keyring.encrypt(text, ns)
+            plain.append({"id": str(i), "text": text, "mode": ns})
+            sealed.append((kid, token))
+
+        print(f"rows={args.rows} namespaces={args.namespaces} text_len={args.text_len}")
+        for k in args.k:
+            picks = random.sample(range(args.rows), k)
+            base = _timeit(lambda: [dict(plain[i]) for i in picks], args.repeat)
+            warm = _timeit(lambda: keyring.decrypt_many([sealed[i] for i in picks]), args.repeat)
+
+            def cold():
+                keyring.clear_cache()
+                keyring.decrypt_many([sealed[i] for i in picks])
+            cold_us = _timeit(cold, max(1, args.repeat // 10))
+            print(f"k={k:<3} plaintext={base:8.1f}us  decrypt(warm keys)={warm:8.1f}us  decrypt(cold keys)={cold_us:8.1f}us")
+
+if __name__ == "__main__":
+    main()
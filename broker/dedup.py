@@ -0,0 +1,89 @@
+import re
+import logging
+import numpy as np
+from datetime import datetime
+from typing import Dict, Any
+
+class DedupStats:
+    """Counters describing how much index growth the dedup stage avoided."""
+    def __init__(self, dimension: int):
+        self.dimension = dimension
+        self.inserted = 0
+        self.exact_hits = 0
+        self.near_hits = 0
+        self.bytes_saved = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        seen = self.inserted + self.exact_hits + self.near_hits
+        skipped = self.exact_hits + self.near_hits
+        return {
+            "inserted": self.inserted,
+            "exact_duplicates": self.exact_hits,
+            "near_duplicates": self.near_hits,
+            "rows_saved": skipped,
+            "bytes_saved": self.bytes_saved,
+            "growth_saved_ratio": (skipped / seen) if seen else 0.0,
+        }
+
+class IngestDeduplicator:
+    """
+    Ingest-time near-duplicate suppression.
+    A message is matched against its own mode (shard) first by exact content hash, then by
+    nearest-neighbour similarity. Matches reinforce the existing memory instead of inserting.
+    Similarity is estimated from the squared L2 distance assuming unit-length embeddings
+    (cos = 1 - d / 2|q|^2), which holds for the host's OpenAI-style embedding providers.
+    """
+    def __init__(self, vs, cfg):
+        self.vs = vs
+        self.cfg = cfg
+        self.stats = DedupStats(vs.get_dimension())
+        self.log = logging.getLogger("SynthMemory")
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.cfg.lifecycle.dedup_enabled)
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return re.sub(r"\s+", " ", text).strip().casefold()
+
+    def fingerprint(self, text: str, mode: str) -> str:
+        return self.vs.fingerprint(self.normalize(text), mode)
+
+    def _thresholds(self) -> Dict[str, int]:
+        return {
+            "reinforced": self.cfg.lifecycle.reinforcement_threshold,
+            "promoted": self.cfg.truth.fact_promotion_threshold,
+        }
+
+    def _reinforce(self, idx: int, text: str) -> bool:
+        meta = self.vs.reinforce(idx, datetime.now().isoformat(), self._thresholds())
+        if meta is None: return False
+        self.stats.bytes_saved += self.stats.dimension * 4 + len(text.encode())
+        self.log.debug(f"[SynthMemory: Dedup] Reinforced {meta.get('id')} (count={meta.get('reinforcement')}).")
+        return True
+
+    def reinforce_exact(self, content_hash: str, text: str, mode: str) -> bool:
+        if not self.enabled: return False
+        idx = self.vs.find_exact(content_hash, mode)
+        if idx is None or not self._reinforce(idx, text): return False
+        self.stats.exact_hits += 1
+        return True
+
+    def reinforce_near(self, vector: np.ndarray, text: str, mode: str) -> bool:
+        if not self.enabled: return False
+        neighbours = self.vs.find_near(vector, mode, k=self.cfg.lifecycle.dedup_neighbours)
+        if not neighbours: return False
+        idx, dist = neighbours[0]
+        q_norm = float(np.dot(vector, vector)) or 1.0
+        similarity = 1.0 - dist / (2.0 * q_norm)
+        if similarity < self.cfg.lifecycle.dedup_similarity_threshold: return False
+        if not self._reinforce(idx, text): return False
+        self.stats.near_hits += 1
+        return True
+
+    def record_insert(self):
+        self.stats.inserted += 1
+
+    def report(self) -> Dict[str, Any]:
+        return self.stats.as_dict()
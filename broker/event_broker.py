@@ -3,9 +3,10 @@ import uuid
 import numpy as np
 import logging
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 from ..utils.cpu_executor import CPUExecutor
 from ..utils.pii import PIIRedactor
+from .dedup import IngestDeduplicator
 
 try:
     from gliner import GLiNER
@@ -24,6 +25,7 @@ class MemoryIndexer:
         self.cfg = cfg
         self.executor = CPUExecutor(max_workers=cfg.performance.cpu_executor_workers)
         self.redactor = PIIRedactor(mode=cfg.security.pii_redaction_mode)
+        self.dedup = IngestDeduplicator(vs, cfg)
         self.gliner_model = None
         self.labels = ["PROJECT", "PERSON", "CONCEPT", "API", "CODE_ENTITY", "ALGORITHM", "PARAMETER"]
         
@@ -40,26 +42,60 @@ class MemoryIndexer:
 
     async def _process_indexing(self, text: str, mode: str):
         try:
-            # 1. PII Redaction
-            clean_text = self.redactor.redact(text)
-            
-            # 2. Parallel AI Ops (Extraction & Embedding)
-            entities = await self.executor.run(self._extract_sync, clean_text)
+            admitted = self.admit(text, mode)
+            if admitted is None: return
+            clean_text, content_hash = admitted
             embedding = await self.embed_fn(clean_text)
-            
-            # 3. Storage persistence
-            doc_id = str(uuid.uuid4())
-            self.vs.add(np.array([embedding]), [{
-                "id": doc_id, "text": clean_text, "mode": mode, "ts": datetime.now().isoformat()
-            }])
-            
-            for ent in entities:
-                ename = ent['text'].lower()
-                self.gs.upsert_entity(ename, ent['text'], ent['label'])
-                self.gs.add_relation(doc_id, ename, "MENTIONS", conf=ent.get('score', 1.0))
+            await self.index_embedded(clean_text, mode, content_hash, embedding)
         except Exception as e:
             self.log.error(f"[SynthMemory: Broker] {e}")
 
+    def admit(self, text: str, mode: str) -> Optional[Tuple[str, str]]:
+        """
+        Steps before embedding: PII redaction and the exact-duplicate check.
+        Returns (clean text, content hash), or None when the message only reinforced an existing memory.
+        """
+        # 1. PII Redaction
+        clean_text = self.redactor.redact(text)
+
+        # 2. Exact-duplicate check (before paying for embedding or extraction)
+        content_hash = self.dedup.fingerprint(clean_text, mode)
+        if self.dedup.reinforce_exact(content_hash, clean_text, mode): return None
+        return clean_text, content_hash
+
+    async def index_embedded(self, clean_text: str, mode: str, content_hash: str, embedding):
+        """Steps after embedding: near-duplicate check, entity extraction and persistence."""
+        # 3. Near-duplicate check against the mode's shard
+        embedding = np.asarray(embedding, dtype='float32')
+        if self.dedup.reinforce_near(embedding, clean_text, mode): return
+
+        # 4. Entity extraction
+        entities = await self.executor.run(self._extract_sync, clean_text)
+
+        # 5. Storage persistence
+        doc_id = str(uuid.uuid4())
+        self.vs.add(embedding.reshape(1, -1), [{
+            "id": doc_id, "text": clean_text, "mode": mode, "ts": datetime.now().isoformat(),
+            "hash": content_hash, "reinforcement": 1
+        }])
+        self.dedup.record_insert()
+
+        for ent in entities:
+            ename = ent['text'].lower()
+            self.gs.upsert_entity(ename, ent['text'], ent['label'])
+            self.gs.add_relation(doc_id, ename, "MENTIONS", conf=ent.get('score', 1.0))
+
+    def reconfigure(self, cfg):
+        """Applies a reloaded config without dropping the loaded GLiNER model or queued work."""
+        if cfg.security.pii_redaction_mode != self.cfg.security.pii_redaction_mode:
+            self.redactor = PIIRedactor(mode=cfg.security.pii_redaction_mode)
+        self.executor.resize(cfg.performance.cpu_executor_workers)
+        self.cfg = cfg
+        self.dedup.cfg = cfg
+
+    def dedup_stats(self) -> Dict[str, Any]:
+        return self.dedup.report()
+
     def _extract_sync(self, text: str) -> List[Dict]:
         self._lazy_load_gliner()
         if self.gliner_model:
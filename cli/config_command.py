@@ -1,6 +1,7 @@
 import argparse
 import sys
 import json
+import time
 from ..config.loader import ConfigurationLoader
 
 def main():
@@ -18,6 +19,21 @@ def main():
     # Validate
     subparsers.add_parser("validate", help="Run safety checks on current config")
 
+    # Reindex
+    reindex_parser = subparsers.add_parser("reindex", help="Show re-embedding progress or schedule a re-embedding")
+    reindex_parser.add_argument("--request", action="store_true", help="Re-embed all memories on next plugin start")
+    reindex_parser.add_argument("--watch", type=float, metavar="SECONDS", help="Refresh progress every SECONDS")
+
+    # Portability
+    export_parser = subparsers.add_parser("export", help="Stream all memories to a portable directory")
+    export_parser.add_argument("path", help="Target directory")
+    export_parser.add_argument("--plaintext", action="store_true", help="Decrypt memory text instead of bundling wrapped keys")
+    import_parser = subparsers.add_parser("import", help="Bulk-load an exported directory")
+    import_parser.add_argument("path", help="Export directory")
+    subparsers.add_parser("backup", help="Take an incremental backup now")
+    restore_parser = subparsers.add_parser("restore", help="Restore stores from a backup (plugin must be stopped)")
+    restore_parser.add_argument("path", help="Backup directory")
+
     args = parser.parse_args()
     loader = ConfigurationLoader()
 
@@ -52,5 +68,80 @@ def main():
         else:
             print("Configuration is healthy.")
 
+    elif args.command == "reindex":
+        from ..store.reindex import read_progress
+        checkpoint = loader.config_dir / "stores" / "vector" / "reindex.json"
+        if args.request:
+            if checkpoint.exists():
+                print("A re-embedding is already scheduled.")
+            else:
+                checkpoint.parent.mkdir(parents=True, exist_ok=True)
+                checkpoint.write_text(json.dumps({"state": "pending", "dimension": None, "target_rows": None}))
+                print("Re-embedding scheduled; it starts the next time the plugin loads.")
+            return
+        while True:
+            state = read_progress(checkpoint)
+            if state is None:
+                print("No re-embedding scheduled or in progress.")
+                return
+            eta = f"{state['eta_s']:.0f}s" if state["eta_s"] is not None else "n/a"
+            print(f"[{state.get('state')}] {state['done_rows']}/{state['total_rows'] or '?'} rows "
+                  f"({state['percent']:.1f}%), embedded={state.get('embedded', 0)} skipped={state.get('skipped', 0)} "
+                  f"{state['rows_per_s']:.1f} rows/s, eta {eta}")
+            if not args.watch: return
+            time.sleep(args.watch)
+
+    elif args.command in ("export", "import", "backup"):
+        from pathlib import Path
+        from ..store.portability import MemoryExporter, MemoryImporter
+        from ..store.backup import IncrementalBackup
+        config = loader.load()
+        fallback_dimension = None
+        if args.command == "import":
+            with open(Path(args.path) / "manifest.json") as f:
+                fallback_dimension = json.load(f)["dimension"]
+        vs, gs, keyring = _open_stores(loader, config, fallback_dimension)
+        try:
+            if args.command == "export":
+                manifest = MemoryExporter(vs, gs, keyring, chunk_rows=config.portability.export_chunk_rows, plaintext=args.plaintext).run(Path(args.path))
+                print(f"Exported {manifest['rows']} memories ({manifest['skipped']} skipped) to {args.path}")
+            elif args.command == "import":
+                stats = MemoryImporter(vs, gs, keyring, batch_rows=config.portability.export_chunk_rows).run(Path(args.path))
+                print(f"Imported {stats['rows']} memories and {stats['graph_tables']} graph table(s)")
+            else:
+                backup = IncrementalBackup(loader.config_dir / "stores", loader.config_dir / "backups", vs, gs, retention=config.portability.backup_retention)
+                manifest = backup.run()
+                print(f"Backup done: copied {manifest['copied']} file(s) ({manifest['bytes']} bytes), linked {manifest['linked']}")
+        finally:
+            if gs: gs.close()
+            if vs: vs.close()
+
+    elif args.command == "restore":
+        from pathlib import Path
+        from ..store.backup import IncrementalBackup
+        aside = IncrementalBackup.restore(Path(args.path), loader.config_dir / "stores")
+        print(f"Restored from {args.path}; previous stores moved to {aside}")
+
+def _open_stores(loader, config, fallback_dimension=None):
+    """Opens the stores offline. The dimension comes from an existing segment, else the fallback."""
+    from ..store.vector_store import FAISSVectorStore, faiss
+    from ..store.cold_store import ColdArchive
+    from ..store.tiered_store import TieredVectorStore
+    from ..store.graph_store import KuzuGraphStore, kuzu
+    from ..utils.encryption import NamespaceKeyring
+    stores = loader.config_dir / "stores"
+    keyring = NamespaceKeyring(stores / "keys.json", master_file=loader.config_dir / "master.key") if config.security.encrypt_at_rest else None
+    if faiss is None:
+        raise SystemExit("FAISS is not available. Please install faiss-cpu.")
+    segment = next((stores / "vector" / "segments").glob("*.index"), None)
+    dimension = faiss.read_index(str(segment)).d if segment is not None else fallback_dimension
+    if dimension is None:
+        raise SystemExit("No vector store found.")
+    vs = FAISSVectorStore(stores / "vector", dimension=dimension, keyring=keyring, segment_window=config.performance.segment_window, max_segment_rows=config.performance.max_segment_rows)
+    if (stores / "cold").exists():
+        vs = TieredVectorStore(vs, ColdArchive(stores / "cold", dimension, keyring=keyring), config)
+    gs = KuzuGraphStore(stores / "graph", buffer_pool_gb=config.performance.graph_buffer_pool_gb) if kuzu else None
+    return vs, gs, keyring
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,80 @@
+import logging
+import threading
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional
+from .loader import ConfigurationLoader
+from .validator import ConfigurationValidator
+from .audit import ConfigurationAudit
+from .schema import SynthMemoryConfig
+
+# Settings read only while the stores are opened; a reload records them but they apply on restart.
+RESTART_REQUIRED = (
+    "daemon.", "security.encrypt_at_rest", "security.key_cache_size", "lifecycle.tiering_enabled",
+    "lifecycle.cold_pq_bytes", "lifecycle.cold_min_train_rows", "performance.graph_buffer_pool_gb",
+    "portability.backup_strategy",
+)
+
+def flatten(data: Dict[str, Any], prefix: str = "") -> Dict[str, Any]:
+    """{"retrieval": {"vector_k": 5}} -> {"retrieval.vector_k": 5}"""
+    flat = {}
+    for key, value in data.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict) and value: flat.update(flatten(value, path + "."))
+        else: flat[path] = value.value if isinstance(value, Enum) else value
+    return flat
+
+def diff(old: SynthMemoryConfig, new: SynthMemoryConfig) -> Dict[str, tuple]:
+    before, after = flatten(old.dict()), flatten(new.dict())
+    return {k: (before.get(k), after.get(k)) for k in sorted(before.keys() | after.keys()) if before.get(k) != after.get(k)}
+
+class ConfigurationReloader:
+    """
+    Turns a changed config.yaml into a live reconfiguration.
+    The file is re-read through the loader (so SY_* overrides still win), checked by the
+    ConfigurationValidator, and only then swapped in: subscribers are called with
+    (old, new) and every changed setting is written to the audit trail. A config that
+    fails to parse, or raises a validator warning the running one does not, is rejected
+    as a whole and the running config stays active.
+    `audit=None` is for processes that follow a config another process already audits.
+    """
+    def __init__(self, loader: ConfigurationLoader, audit: Optional[ConfigurationAudit], current: SynthMemoryConfig):
+        self.loader = loader
+        self.audit = audit
+        self.current = current
+        self.log = logging.getLogger("SynthMemory")
+        self._subscribers: List[Callable[[SynthMemoryConfig, SynthMemoryConfig], None]] = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, fn: Callable[[SynthMemoryConfig, SynthMemoryConfig], None]):
+        self._subscribers.append(fn)
+
+    def reload(self) -> Dict[str, tuple]:
+        """Applies config.yaml if it is valid; returns the applied changes."""
+        with self._lock:
+            try:
+                new = self.loader.load()
+            except Exception as e:
+                self.log.error(f"[SynthMemory: Config] Rejected {self.loader.config_path.name}: {e}")
+                if self.audit: self.audit.log_event("config_rejected", str(e))
+                return {}
+            _, known = ConfigurationValidator.validate(self.current)
+            warnings = [w for w in ConfigurationValidator.validate(new)[1] if w not in known]
+            if warnings:
+                self.log.warning(f"[SynthMemory: Config] Rejected {self.loader.config_path.name}: {'; '.join(warnings)}")
+                if self.audit: self.audit.log_event("config_rejected", "; ".join(warnings))
+                return {}
+            changes = diff(self.current, new)
+            if not changes: return {}
+
+            old, self.current = self.current, new
+            for fn in self._subscribers:
+                try:
+                    fn(old, new)
+                except Exception as e:
+                    self.log.error(f"[SynthMemory: Config] Applying reload: {e}")
+            for setting, (before, after) in changes.items():
+                if self.audit: self.audit.log_change(setting, before, after, source=self.loader.config_path.name)
+            self.log.info(f"[SynthMemory: Config] Applied {len(changes)} change(s): {', '.join(changes)}.")
+            deferred = [k for k in changes if k.startswith(RESTART_REQUIRED)]
+            if deferred: self.log.warning(f"[SynthMemory: Config] Takes effect after a restart: {', '.join(deferred)}.")
+            return changes
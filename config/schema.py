@@ -31,23 +31,39 @@ class PerformanceConfig(BaseModel):
     extraction_provider: ExtractionProvider = ExtractionProvider.GLINER
     indexing_strategy: IndexingStrategy = IndexingStrategy.DEBOUNCED
     debounce_ms: int = Field(default=1000, ge=100)
+    config_reload_debounce_ms: int = Field(default=500, ge=50)
     gpu_layer_offload: int = Field(default=0, ge=0, le=100)
     vector_index_type: VectorIndexType = VectorIndexType.FLAT
     graph_buffer_pool_gb: int = Field(default=4, ge=1, alias='buffer_pool_gb')
     cpu_executor_workers: int = Field(default=4, ge=1, le=32)
     embedding_batch_size: int = Field(default=64, ge=1)
+    reindex_concurrency: int = Field(default=4, ge=1, le=64)
     ner_extraction_timeout_ms: int = Field(default=2000, ge=100, alias='ner_timeout_ms')
+    segment_window: Literal["day", "week", "month"] = "week"
+    max_segment_rows: int = Field(default=4096, ge=256)
 
 class LifecycleConfig(BaseModel):
     retention_policy: str = "Forever"
     compression_policy: Literal["Summarize", "Archive", "Delete"] = "Summarize"
     reinforcement_threshold: int = Field(default=3, ge=1)
+    dedup_enabled: bool = True
+    dedup_similarity_threshold: float = Field(default=0.97, ge=0.5, le=1.0)
+    dedup_neighbours: int = Field(default=4, ge=1, le=64)
+    tiering_enabled: bool = True
+    hot_max_age_days: int = Field(default=30, ge=1)
+    hot_max_rows: int = Field(default=50000, ge=1000)
+    cold_pq_bytes: int = Field(default=64, ge=8, le=256)
+    cold_min_train_rows: int = Field(default=1024, ge=256)
+    mover_interval_s: int = Field(default=3600, ge=60)
+    summary_max_chars: int = Field(default=280, ge=40)
 
 class SecurityConfig(BaseModel):
     pii_redaction_mode: PIIRedactionMode = PIIRedactionMode.STRICT
     cross_mode_inference: bool = False
     forget_policy: Literal["HardDelete", "SoftDelete", "CryptoShred"] = "CryptoShred"
     audit_log_enabled: bool = True
+    encrypt_at_rest: bool = True
+    key_cache_size: int = Field(default=16, ge=1)
 
 class RetrievalConfig(BaseModel):
     vector_k: int = Field(default=5, ge=1)
@@ -55,6 +71,11 @@ class RetrievalConfig(BaseModel):
     graph_depth_traversal: int = Field(default=2, ge=1, le=5)
     context_window_injection_ratio: float = Field(default=20.0, ge=0.0, le=50.0)
     rrf_k_parameter: int = Field(default=60, ge=20)
+    cold_tier_budget_ms: int = Field(default=150, ge=0)
+    recency_window_days: Optional[int] = Field(default=None, ge=1)
+    default_context_window: int = Field(default=8192, ge=512)
+    max_tokens_per_memory: int = Field(default=256, ge=32)
+    packing_dedup_jaccard: float = Field(default=0.8, ge=0.0, le=1.0)
 
 class TruthConfig(BaseModel):
     contradiction_handling: str = "HighestConfidenceWins"
@@ -77,6 +98,16 @@ class PortabilityConfig(BaseModel):
     export_format: str = "JSON"
     encryption_key_rotation: bool = True
     backup_strategy: str = "LocalDaily"
+    backup_retention: int = Field(default=7, ge=1)
+    export_chunk_rows: int = Field(default=4096, ge=64)
+
+class DaemonConfig(BaseModel):
+    enabled: bool = False
+    socket_path: Optional[str] = None
+    autostart: bool = True
+    startup_timeout_s: float = Field(default=15.0, ge=1.0)
+    request_timeout_s: float = Field(default=10.0, ge=0.5)
+    max_batch: int = Field(default=64, ge=1, le=1024)
 
 class SynthMemoryConfig(BaseModel):
     performance: PerformanceConfig = Field(default_factory=PerformanceConfig)
@@ -87,6 +118,7 @@ class SynthMemoryConfig(BaseModel):
     taxonomy: TaxonomyConfig = Field(default_factory=TaxonomyConfig)
     visualization: VisualizationConfig = Field(default_factory=VisualizationConfig)
     portability: PortabilityConfig = Field(default_factory=PortabilityConfig)
+    daemon: DaemonConfig = Field(default_factory=DaemonConfig)
 
     class Config:
         use_enum_values = True
@@ -1,36 +1,121 @@
+import os
 import time
+import select
+import struct
+import ctypes
+import ctypes.util
+import logging
 import threading
 from pathlib import Path
-from typing import Callable
+from typing import Callable, Optional
+
+# inotify(7) flags; the directory is watched because editors save by rename.
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_NONBLOCK = 0x00000800
+IN_CLOEXEC = 0x00080000
+_EVENT = struct.Struct("iIII")
+
+def _libc():
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    except OSError:
+        return None
+    return libc if hasattr(libc, "inotify_init1") else None
 
 class ConfigurationWatcher:
-    def __init__(self, config_path: Path, callback: Callable):
+    """
+    Calls `callback` once `config.yaml` has been written and left alone for `debounce_ms`,
+    so an editor's save (truncate, write, rename) or a burst of saves triggers one reload.
+    Uses inotify where available and falls back to polling the file's mtime elsewhere.
+    """
+    def __init__(self, config_path: Path, callback: Callable, debounce_ms: int = 500, poll_s: float = 2.0):
         self.config_path = config_path
         self.callback = callback
+        self.debounce_s = debounce_ms / 1000.0
+        self.poll_s = poll_s
+        self.log = logging.getLogger("SynthMemory")
         self._running = False
-        self._last_mtime = 0
+        self._last_sig = None
+        self._fd: Optional[int] = None
+        self._thread = None
 
     def start(self):
         if self._running: return
         self._running = True
-        if self.config_path.exists():
-            self._last_mtime = self.config_path.stat().st_mtime
-        
-        thread = threading.Thread(target=self._watch_loop, daemon=True)
-        thread.start()
+        self._last_sig = self._signature()
+        self._fd = self._open_inotify()
+        target = self._inotify_loop if self._fd is not None else self._poll_loop
+        self._thread = threading.Thread(target=target, daemon=True)
+        self._thread.start()
+
+    def _signature(self):
+        try:
+            st = self.config_path.stat()
+            return st.st_mtime_ns, st.st_size
+        except OSError:
+            return None
+
+    def _open_inotify(self) -> Optional[int]:
+        libc = _libc()
+        if libc is None: return None
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0: return None
+        self.config_path.parent.mkdir(parents=True, exist_ok=True)
+        wd = libc.inotify_add_watch(fd, os.fsencode(self.config_path.parent), IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE)
+        if wd < 0:
+            self.log.warning(f"[SynthMemory: Watcher] inotify unavailable ({os.strerror(ctypes.get_errno())}); polling {self.config_path.name}.")
+            os.close(fd)
+            return None
+        return fd
+
+    def _touched(self) -> bool:
+        """Drains pending inotify events; True if any concerned the config file."""
+        hit = False
+        while True:
+            try:
+                buf = os.read(self._fd, 4096)
+            except BlockingIOError:
+                return hit
+            offset = 0
+            while offset + _EVENT.size <= len(buf):
+                _, _, _, length = _EVENT.unpack_from(buf, offset)
+                name = buf[offset + _EVENT.size:offset + _EVENT.size + length].rstrip(b"\0")
+                if name == os.fsencode(self.config_path.name): hit = True
+                offset += _EVENT.size + length
 
-    def _watch_loop(self):
+    def _inotify_loop(self):
+        deadline = None
         while self._running:
+            timeout = self.poll_s if deadline is None else max(0.0, deadline - time.monotonic())
             try:
-                if self.config_path.exists():
-                    current_mtime = self.config_path.stat().st_mtime
-                    if current_mtime > self._last_mtime:
-                        self._last_mtime = current_mtime
-                        # Trigger the reload callback
-                        self.callback()
-            except Exception as e:
-                print(f"[SynthMemory Watcher] Error: {e}")
-            time.sleep(2) # Config check interval
+                ready, _, _ = select.select([self._fd], [], [], timeout)
+                if ready and self._touched():
+                    # Every further write pushes the reload back until the file is quiet.
+                    deadline = time.monotonic() + self.debounce_s
+                elif deadline is not None and time.monotonic() >= deadline:
+                    deadline = None
+                    self._fire()
+            except (OSError, ValueError) as e:
+                if self._running: self.log.error(f"[SynthMemory: Watcher] {e}")
+                break
+        os.close(self._fd)
+
+    def _poll_loop(self):
+        while self._running:
+            time.sleep(self.poll_s)
+            self._fire()
+
+    def _fire(self):
+        sig = self._signature()
+        # Events that left the file as it was (e.g. it was deleted and not yet recreated) do not reload.
+        if sig is None or sig == self._last_sig: return
+        self._last_sig = sig
+        try:
+            self.callback()
+        except Exception as e:
+            self.log.error(f"[SynthMemory: Watcher] Reload failed: {e}")
 
     def stop(self):
-        self._running = False
\ No newline at end of file
+        self._running = False
@@ -0,0 +1,270 @@
+import os
+import sys
+import time
+import queue
+import socket
+import itertools
+import asyncio
+import logging
+import threading
+import subprocess
+import numpy as np
+from pathlib import Path
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple
+from .protocol import encode_frame, read_frame, ProtocolError
+from ..store.vector_store import to_epoch
+
+class MemoryDaemonError(RuntimeError):
+    pass
+
+class _Connection:
+    """One socket plus the requests sent on it that still await a reply, keyed by request id."""
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.pending: Dict[int, Future] = {}
+        self.lock = threading.Lock()
+        self.broken = False
+
+    def fail(self, error: Exception):
+        with self.lock:
+            self.broken = True
+            pending, self.pending = self.pending, {}
+        try: self.sock.shutdown(socket.SHUT_RDWR)  # Wakes the reader thread blocked in recv.
+        except OSError: pass
+        self.sock.close()
+        for fut in pending.values():
+            if not fut.done(): fut.set_exception(error)
+
+class DaemonClient:
+    """
+    Pipelined connection to the memory daemon.
+    Calls from any thread are queued; a single pump thread sends everything that queued up
+    since its last send as one batch, so concurrent recall and ingest traffic coalesces
+    into few round trips without callers batching by hand. Every request carries an id
+    and the daemon answers each one as soon as it finishes, so a slow extraction never
+    holds up the searches behind it. Exports and imports get a connection of their own.
+    """
+    def __init__(self, socket_path: Path, timeout_s: float = 10.0, max_batch: int = 64):
+        self.socket_path = socket_path
+        self.timeout_s = timeout_s
+        self.max_batch = max_batch
+        self.log = logging.getLogger("SynthMemory")
+        self._queue: "queue.Queue[Optional[Tuple[Dict, Future]]]" = queue.Queue()
+        self._conn: Optional[_Connection] = None
+        self._ids = itertools.count(1)
+        self._closed = False
+        self._thread = threading.Thread(target=self._pump, daemon=True)
+        self._thread.start()
+
+    def _open_socket(self) -> socket.socket:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout_s)
+        sock.connect(str(self.socket_path))
+        # Replies may be far apart; callers time out on their futures instead.
+        sock.settimeout(None)
+        return sock
+
+    def _connect(self) -> _Connection:
+        if self._conn is None or self._conn.broken:
+            self._conn = _Connection(self._open_socket())
+            threading.Thread(target=self._read_replies, args=(self._conn,), daemon=True).start()
+        return self._conn
+
+    def _read_replies(self, conn: _Connection):
+        try:
+            while True:
+                for reply in read_frame(conn.sock):
+                    with conn.lock:
+                        fut = conn.pending.pop(reply.get("id"), None)
+                    if fut is None or fut.done(): continue
+                    if "error" in reply: fut.set_exception(MemoryDaemonError(reply["error"]))
+                    else: fut.set_result(reply.get("ok"))
+        except (OSError, ProtocolError) as e:
+            # Drop the connection; the next batch reconnects (e.g. after a daemon restart).
+            conn.fail(MemoryDaemonError(f"Memory daemon unreachable: {e}"))
+
+    def _pump(self):
+        while True:
+            item = self._queue.get()
+            if item is None: break
+            batch = [item]
+            while len(batch) < self.max_batch:
+                try: nxt = self._queue.get_nowait()
+                except queue.Empty: break
+                if nxt is None:
+                    self._queue.put(None)
+                    break
+                batch.append(nxt)
+            try:
+                conn = self._connect()
+            except OSError as e:
+                for _, fut in batch: fut.set_exception(MemoryDaemonError(f"Memory daemon unreachable: {e}"))
+                continue
+            messages = []
+            with conn.lock:
+                for msg, fut in batch:
+                    msg["id"] = next(self._ids)
+                    conn.pending[msg["id"]] = fut
+                    messages.append(msg)
+            try:
+                conn.sock.sendall(encode_frame(messages))
+            except OSError as e:
+                conn.fail(MemoryDaemonError(f"Memory daemon unreachable: {e}"))
+
+    def submit(self, op: str, *args, **kwargs) -> Future:
+        if self._closed: raise MemoryDaemonError("Client is closed.")
+        fut = Future()
+        self._queue.put(({"op": op, "args": list(args), "kwargs": kwargs}, fut))
+        return fut
+
+    def call(self, op: str, *args, **kwargs) -> Any:
+        return self.submit(op, *args, **kwargs).result(timeout=self.timeout_s)
+
+    def call_many(self, requests: List[Tuple[str, tuple, dict]]) -> List[Any]:
+        """Sends several requests together; they travel in one frame unless it is already full."""
+        futures = [self.submit(op, *args, **kwargs) for op, args, kwargs in requests]
+        return [f.result(timeout=self.timeout_s) for f in futures]
+
+    def call_detached(self, op: str, *args, **kwargs) -> Any:
+        """Runs a long operation (export, import) on its own connection, without a timeout."""
+        if self._closed: raise MemoryDaemonError("Client is closed.")
+        try:
+            with self._open_socket() as sock:
+                sock.sendall(encode_frame([{"id": 0, "op": op, "args": list(args), "kwargs": kwargs}]))
+                reply = read_frame(sock)[0]
+        except (OSError, ProtocolError) as e:
+            raise MemoryDaemonError(f"Memory daemon unreachable: {e}") from e
+        if "error" in reply: raise MemoryDaemonError(reply["error"])
+        return reply.get("ok")
+
+    def ping(self) -> bool:
+        try:
+            return bool(self.call("ping"))
+        except Exception:
+            return False
+
+    def close(self):
+        if self._closed: return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout=self.timeout_s)
+        if self._conn is not None: self._conn.fail(MemoryDaemonError("Client is closed."))
+
+def spawn_daemon(data_dir: Path, socket_path: Path) -> subprocess.Popen:
+    """Starts the daemon as a detached `python -m <package>.daemon.server` process."""
+    package_dir = Path(__file__).resolve().parent.parent
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(package_dir.parent), env.get("PYTHONPATH")]))
+    return subprocess.Popen(
+        [sys.executable, "-m", f"{package_dir.name}.daemon.server", "--data-dir", str(data_dir), "--socket", str(socket_path)],
+        env=env, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True
+    )
+
+def connect(data_dir: Path, socket_path: Path, dimension: int, cfg) -> DaemonClient:
+    """Connects to the daemon (starting it when allowed) and announces the embedding dimension."""
+    dc = cfg.daemon
+    client = DaemonClient(socket_path, timeout_s=dc.request_timeout_s, max_batch=dc.max_batch)
+    if not client.ping():
+        if not dc.autostart:
+            client.close()
+            raise MemoryDaemonError(f"No memory daemon at {socket_path}.")
+        spawn_daemon(data_dir, socket_path)
+        deadline = time.monotonic() + dc.startup_timeout_s
+        while not client.ping():
+            if time.monotonic() > deadline:
+                client.close()
+                raise MemoryDaemonError(f"Memory daemon did not come up at {socket_path}.")
+            time.sleep(0.2)
+    try:
+        client.call("hello", dimension)
+    except Exception:
+        client.close()
+        raise
+    return client
+
+class RemoteVectorStore:
+    """Vector store surface backed by the daemon."""
+    def __init__(self, client: DaemonClient, dimension: int):
+        self.client = client
+        self.dimension = dimension
+
+    def add(self, vectors: np.ndarray, metas: List[Dict], persist: bool = True):
+        self.client.call("add", np.asarray(vectors, dtype='float32'), metas, persist=persist)
+
+    def flush(self):
+        self.client.call("flush")
+
+    def search(self, query_vector: np.ndarray, k: int = 5, since=None, as_of=None) -> List[Dict[str, Any]]:
+        return self.client.call("search", np.asarray(query_vector, dtype='float32'), k=k, since=to_epoch(since), as_of=to_epoch(as_of))
+
+    def shred_namespace(self, namespace: str) -> int:
+        return self.client.call("shred_namespace", namespace)
+
+    def fingerprint(self, text: str, namespace: str) -> str:
+        return self.client.call("fingerprint", text, namespace)
+
+    def find_exact(self, content_hash: str, namespace: str) -> Optional[int]:
+        return self.client.call("find_exact", content_hash, namespace)
+
+    def find_near(self, vector: np.ndarray, namespace: str, k: int = 4) -> List[Tuple[int, float]]:
+        return [tuple(pair) for pair in self.client.call("find_near", np.asarray(vector, dtype='float32'), namespace, k=k)]
+
+    def reinforce(self, idx: int, ts: str, thresholds: Optional[Dict[str, int]] = None) -> Optional[Dict]:
+        return self.client.call("reinforce", idx, ts, thresholds)
+
+    def get_dimension(self):
+        return self.dimension
+
+    def close(self):
+        pass
+
+class RemoteGraphStore:
+    """Graph store surface backed by the daemon."""
+    def __init__(self, client: DaemonClient):
+        self.client = client
+
+    def upsert_entity(self, eid: str, name: str, etype: str) -> None:
+        self.client.call("upsert_entity", eid, name, etype)
+
+    def add_relation(self, src: str, dst: str, rtype: str, weight: float = 1.0, conf: float = 1.0) -> None:
+        self.client.call("add_relation", src, dst, rtype, weight=weight, conf=conf)
+
+    def get_community_id(self, entity_id: str) -> Optional[int]:
+        return self.client.call("get_community_id", entity_id)
+
+    def traverse_bounded(self, start_id: str, depth: int = 2, limit: int = 50, as_of: Optional[str] = None, temporal: bool = True) -> List[Dict[str, Any]]:
+        return self.client.call("traverse_bounded", start_id, depth=depth, limit=limit, as_of=as_of, temporal=temporal)
+
+    def close(self):
+        pass
+
+class RemoteIndexer:
+    """
+    Ingest front end for daemon mode. The daemon redacts and checks exact duplicates first,
+    so repeated messages are never embedded; the client embeds with the host provider and
+    queues the rest of the pipeline (near-dedup, extraction, persistence) on the daemon.
+    """
+    def __init__(self, client: DaemonClient, embed_fn):
+        self.client = client
+        self.embed_fn = embed_fn
+        self.log = logging.getLogger("SynthMemory")
+
+    async def on_user_msg(self, text: str, mode: str):
+        asyncio.create_task(self._process_indexing(text, mode))
+
+    async def _process_indexing(self, text: str, mode: str):
+        try:
+            admitted = await asyncio.to_thread(self.client.call, "admit", text, mode)
+            if admitted is None: return
+            clean_text, content_hash = admitted
+            embedding = np.asarray(await self.embed_fn(clean_text), dtype='float32')
+            await asyncio.to_thread(self.client.call, "ingest", clean_text, mode, content_hash, embedding)
+        except Exception as e:
+            self.log.error(f"[SynthMemory: Broker] {e}")
+
+    def _extract_sync(self, text: str) -> List[Dict]:
+        return self.client.call("extract", text)
+
+    def dedup_stats(self) -> Dict[str, Any]:
+        return self.client.call("dedup_stats")
@@ -0,0 +1,88 @@
+import json
+import struct
+import socket
+import numpy as np
+from typing import Any, List, Tuple
+
+# Frame: magic, version, message count, control-section length, blob length.
+# The control section is compact JSON (one entry per batched message); arrays and bytes
+# travel raw in the blob and are referenced from it by offset, so vectors are never
+# text-encoded. Requests carry an "id" that their reply echoes; replies arrive in
+# completion order, not request order.
+MAGIC = b"SM"
+VERSION = 2
+HEADER = struct.Struct("!2sBHII")
+MAX_FRAME_BYTES = 256 * 1024 * 1024
+
+class ProtocolError(RuntimeError):
+    pass
+
+def _default(obj):
+    if isinstance(obj, np.generic): return obj.item()
+    return str(obj)
+
+def encode_frame(messages: List[Any]) -> bytes:
+    blob = bytearray()
+
+    def pack(obj):
+        if isinstance(obj, np.ndarray):
+            arr = np.ascontiguousarray(obj)
+            ref = {"$nd": [len(blob), arr.dtype.str, list(arr.shape)]}
+            blob.extend(arr.tobytes())
+            return ref
+        if isinstance(obj, (bytes, bytearray)):
+            ref = {"$b": [len(blob), len(obj)]}
+            blob.extend(obj)
+            return ref
+        if isinstance(obj, dict): return {k: pack(v) for k, v in obj.items()}
+        if isinstance(obj, (list, tuple)): return [pack(v) for v in obj]
+        return obj
+
+    control = json.dumps([pack(m) for m in messages], separators=(",", ":"), default=_default).encode()
+    return HEADER.pack(MAGIC, VERSION, len(messages), len(control), len(blob)) + control + bytes(blob)
+
+def decode_body(control: bytes, blob: bytes) -> List[Any]:
+    view = memoryview(blob)
+
+    def unpack(obj):
+        if isinstance(obj, dict):
+            if "$nd" in obj:
+                offset, dtype, shape = obj["$nd"]
+                count = int(np.prod(shape)) if shape else 1
+                return np.frombuffer(view, dtype=np.dtype(dtype), count=count, offset=offset).reshape(shape).copy()
+            if "$b" in obj:
+                offset, size = obj["$b"]
+                return bytes(view[offset:offset + size])
+            return {k: unpack(v) for k, v in obj.items()}
+        if isinstance(obj, list): return [unpack(v) for v in obj]
+        return obj
+
+    return [unpack(m) for m in json.loads(control)]
+
+def parse_header(header: bytes) -> Tuple[int, int, int]:
+    magic, version, count, control_len, blob_len = HEADER.unpack(header)
+    if magic != MAGIC or version != VERSION:
+        raise ProtocolError(f"Unsupported frame (magic={magic!r}, version={version}).")
+    if control_len + blob_len > MAX_FRAME_BYTES:
+        raise ProtocolError(f"Frame of {control_len + blob_len} bytes exceeds the limit.")
+    return count, control_len, blob_len
+
+def _recv_exact(sock: socket.socket, n: int) -> bytes:
+    buf = bytearray()
+    while len(buf) < n:
+        chunk = sock.recv(min(n - len(buf), 1 << 20))
+        if not chunk: raise ConnectionError("Memory daemon closed the connection.")
+        buf.extend(chunk)
+    return bytes(buf)
+
+def read_frame(sock: socket.socket) -> List[Any]:
+    """Blocking read of one frame from a socket."""
+    _, control_len, blob_len = parse_header(_recv_exact(sock, HEADER.size))
+    return decode_body(_recv_exact(sock, control_len), _recv_exact(sock, blob_len))
+
+async def read_frame_async(reader) -> List[Any]:
+    """Reads one frame from an asyncio StreamReader; raises IncompleteReadError at EOF."""
+    _, control_len, blob_len = parse_header(await reader.readexactly(HEADER.size))
+    control = await reader.readexactly(control_len)
+    blob = await reader.readexactly(blob_len) if blob_len else b""
+    return decode_body(control, blob)
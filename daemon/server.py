@@ -0,0 +1,224 @@
+import os
+import sys
+import signal
+import socket
+import asyncio
+import logging
+import argparse
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from .protocol import encode_frame, read_frame_async, ProtocolError
+from ..config.loader import ConfigurationLoader
+from ..config.audit import ConfigurationAudit
+from ..config.reload import ConfigurationReloader
+from ..config.watcher import ConfigurationWatcher
+from ..store.factory import StoreBundle
+from ..store.portability import MemoryExporter, MemoryImporter
+from ..broker.event_broker import MemoryIndexer
+
+def default_socket_path(data_dir: Path) -> Path:
+    return data_dir / "memory.sock"
+
+class MemoryDaemon:
+    """
+    Out-of-process owner of the memory stores, the GLiNER model and the ingest queue.
+    Several pygpt processes talk to one daemon over a Unix domain socket instead of each
+    loading its own copy of the stores and racing on their files. Every frame carries a
+    batch of requests, each with an id; they run concurrently and each reply is sent as
+    soon as it is ready (replies finishing together share a frame), so one slow request
+    never delays the others. Embeddings stay with the clients, which own the embedding provider.
+    """
+    def __init__(self, data_dir: Path, cfg, socket_path: Optional[Path] = None, dimension: Optional[int] = None):
+        self.data_dir = data_dir
+        self.cfg = cfg
+        self.socket_path = socket_path or default_socket_path(data_dir)
+        self.log = logging.getLogger("SynthMemory")
+        self.stores: Optional[StoreBundle] = None
+        self.indexer: Optional[MemoryIndexer] = None
+        self._ingest: Optional[asyncio.Queue] = None
+        self._ops: Dict[str, Any] = {}
+        self._server = None
+        self._owns_socket = True
+        self._loop, self._stop = None, None
+        self._initial_dimension = dimension
+        self.watcher: Optional[ConfigurationWatcher] = None
+
+    def _open(self, dimension: int):
+        self.stores = StoreBundle(self.data_dir, self.cfg, dimension)
+        if self.stores.hot is not None and getattr(self.stores.hot, "reindex_file", None) and self.stores.hot.reindex_file.exists():
+            self.log.warning("[SynthMemory: Daemon] A re-embedding is pending; it needs the host's embedding provider and runs when a plugin starts in in-process mode.")
+        vs, gs = self.stores.vs, self.stores.gs
+        self.indexer = MemoryIndexer(None, vs, gs, self.cfg)
+        self._ops = {
+            "search": vs.search, "add": vs.add, "shred_namespace": vs.shred_namespace,
+            "fingerprint": vs.fingerprint, "find_exact": vs.find_exact, "find_near": vs.find_near,
+            "reinforce": vs.reinforce, "get_dimension": vs.get_dimension, "flush": vs.flush,
+            "upsert_entity": gs.upsert_entity, "add_relation": gs.add_relation,
+            "get_community_id": gs.get_community_id, "traverse_bounded": gs.traverse_bounded,
+            "admit": self.indexer.admit, "extract": self.indexer._extract_sync, "dedup_stats": self.indexer.dedup_stats,
+            "export": self._export, "import": self._import,
+        }
+        self.log.info(f"[SynthMemory: Daemon] Stores open at dimension {dimension}.")
+
+    def _watch_config(self):
+        loader = ConfigurationLoader(str(self.data_dir))
+        reloader = ConfigurationReloader(loader, ConfigurationAudit(self.data_dir / "config_audit.jsonl"), self.cfg)
+        reloader.subscribe(self._apply_config)
+        self.watcher = ConfigurationWatcher(loader.config_path, reloader.reload, debounce_ms=self.cfg.performance.config_reload_debounce_ms)
+        self.watcher.start()
+
+    def _apply_config(self, old, new):
+        self.cfg = new
+        self.watcher.debounce_s = new.performance.config_reload_debounce_ms / 1000.0
+        if self.stores is None: return
+        self.indexer.reconfigure(new)
+        self.stores.reconfigure(new)
+
+    def _export(self, out_dir: str, plaintext: bool = False):
+        port = self.cfg.portability
+        return MemoryExporter(self.stores.vs, self.stores.gs, self.stores.keyring, chunk_rows=port.export_chunk_rows, plaintext=plaintext).run(Path(out_dir))
+
+    def _import(self, in_dir: str):
+        port = self.cfg.portability
+        return MemoryImporter(self.stores.vs, self.stores.gs, self.stores.keyring, batch_rows=port.export_chunk_rows).run(Path(in_dir))
+
+    def _hello(self, dimension: int) -> Dict[str, Any]:
+        if self.stores is None: self._open(dimension)
+        current = self.stores.vs.get_dimension()
+        if current != dimension:
+            raise ValueError(f"Daemon stores use dimension {current}, client embeds at {dimension}.")
+        return {"pid": os.getpid(), "dimension": current}
+
+    async def _dispatch(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        op, args, kwargs = message.get("op"), message.get("args", []), message.get("kwargs", {})
+        try:
+            if op == "ping": return {"ok": True}
+            if op == "hello": return {"ok": self._hello(*args)}
+            if self.stores is None: raise RuntimeError("Daemon stores are not open; send 'hello' first.")
+            if op == "ingest":
+                # Acknowledged once queued; the worker runs near-dedup, extraction and persistence.
+                await self._ingest.put(args)
+                return {"ok": self._ingest.qsize()}
+            fn = self._ops.get(op)
+            if fn is None: raise ValueError(f"Unknown op '{op}'.")
+            if op == "extract": return {"ok": await self.indexer.executor.run(fn, *args, **kwargs)}
+            return {"ok": await asyncio.to_thread(fn, *args, **kwargs)}
+        except Exception as e:
+            return {"error": f"{type(e).__name__}: {e}"}
+
+    async def _ingest_worker(self):
+        while True:
+            clean_text, mode, content_hash, embedding = await self._ingest.get()
+            try:
+                await self.indexer.index_embedded(clean_text, mode, content_hash, embedding)
+            except Exception as e:
+                self.log.error(f"[SynthMemory: Daemon] Ingest failed: {e}")
+            finally:
+                self._ingest.task_done()
+
+    async def _answer(self, message: Dict[str, Any], outbox: asyncio.Queue):
+        reply = await self._dispatch(message)
+        reply["id"] = message.get("id")
+        outbox.put_nowait(reply)
+
+    async def _send_replies(self, writer, outbox: asyncio.Queue):
+        try:
+            while True:
+                replies = [await outbox.get()]
+                while not outbox.empty(): replies.append(outbox.get_nowait())
+                writer.write(encode_frame(replies))
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+
+    async def _handle(self, reader, writer):
+        outbox: asyncio.Queue = asyncio.Queue()
+        sender = asyncio.create_task(self._send_replies(writer, outbox))
+        running = set()
+        try:
+            while True:
+                for message in await read_frame_async(reader):
+                    task = asyncio.create_task(self._answer(message, outbox))
+                    running.add(task)
+                    task.add_done_callback(running.discard)
+        except (asyncio.IncompleteReadError, asyncio.CancelledError):
+            # Client hung up, or the daemon is shutting down with the client still attached.
+            pass
+        except (ProtocolError, ConnectionError) as e:
+            self.log.warning(f"[SynthMemory: Daemon] Dropping client: {e}")
+        finally:
+            sender.cancel()
+            writer.close()
+
+    def _socket_in_use(self) -> bool:
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(str(self.socket_path))
+            return True
+        except OSError:
+            return False
+        finally:
+            probe.close()
+
+    async def serve(self):
+        if self.socket_path.exists():
+            # Two plugins may autostart a daemon at once; the loser must not steal the socket.
+            if self._socket_in_use():
+                self.log.info(f"[SynthMemory: Daemon] Another daemon already serves {self.socket_path}; exiting.")
+                self._owns_socket = False
+                self.close()
+                return
+            self.socket_path.unlink()
+        if self._initial_dimension: self._open(self._initial_dimension)
+        self._watch_config()
+        self._ingest = asyncio.Queue()
+        worker = asyncio.create_task(self._ingest_worker())
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        # The socket must be owner-only from the moment it exists, not after a later chmod.
+        umask = os.umask(0o177)
+        try:
+            self._server = await asyncio.start_unix_server(self._handle, path=str(self.socket_path))
+        finally:
+            os.umask(umask)
+        self.log.info(f"[SynthMemory: Daemon] Listening on {self.socket_path}.")
+
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try: self._loop.add_signal_handler(sig, self._stop.set)
+            except (RuntimeError, ValueError): pass  # Not the main thread (embedded use); call stop().
+        await self._stop.wait()
+
+        self._server.close()
+        await self._server.wait_closed()
+        await self._ingest.join()
+        worker.cancel()
+        self.close()
+
+    def stop(self):
+        """Thread-safe shutdown request; serve() drains the ingest queue and closes the stores."""
+        if self._loop is not None: self._loop.call_soon_threadsafe(self._stop.set)
+
+    def close(self):
+        if self.watcher: self.watcher.stop()
+        if self._owns_socket and self.socket_path.exists(): self.socket_path.unlink()
+        if self.stores: self.stores.close()
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="SynthMemory local memory daemon")
+    parser.add_argument("--data-dir", default=str(Path.home() / ".synthmemory"))
+    parser.add_argument("--socket", help="Socket path (default: <data-dir>/memory.sock or daemon.socket_path)")
+    parser.add_argument("--dimension", type=int, help="Open the stores now instead of on the first client hello")
+    args = parser.parse_args(argv)
+
+    data_dir = Path(args.data_dir)
+    cfg = ConfigurationLoader(str(data_dir)).load()
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s",
+        handlers=[logging.FileHandler(data_dir / "daemon.log"), logging.StreamHandler(sys.stderr)]
+    )
+    socket_path = Path(args.socket or cfg.daemon.socket_path or default_socket_path(data_dir))
+    asyncio.run(MemoryDaemon(data_dir, cfg, socket_path, args.dimension).serve())
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import asyncio
+import threading
 import numpy as np
 from pathlib import Path
 import logging
@@ -6,8 +7,16 @@ from pygpt_net.plugin.base.plugin import BasePlugin
 from pygpt_net.core.events import Event
 from pygpt_net.item.ctx import CtxItem
 from .config.loader import ConfigurationLoader
-from .store.vector_store import FAISSVectorStore, NoOpVectorStore
-from .store.graph_store import KuzuGraphStore, NoOpGraphStore
+from .config.audit import ConfigurationAudit
+from .config.reload import ConfigurationReloader
+from .config.watcher import ConfigurationWatcher
+from .store.vector_store import FAISSVectorStore
+from .store.factory import StoreBundle
+from .store.reindex import ReindexPipeline
+from .store.portability import MemoryExporter, MemoryImporter
+from .utils.encryption import KeyringError
+from .daemon.client import connect, RemoteVectorStore, RemoteGraphStore, RemoteIndexer
+from .daemon.server import default_socket_path
 
 class SynthMemoryPlugin(BasePlugin):
     def __init__(self, *args, **kwargs):
@@ -20,31 +29,84 @@ class SynthMemoryPlugin(BasePlugin):
         self.loader = ConfigurationLoader(str(self.data_dir))
         self.cfg = self.loader.load()
         self.vs, self.gs, self.retriever, self.broker = None, None, None, None
+        self.stores, self.client, self.packer = None, None, None
+        self.reloader, self.watcher = None, None
+        self.keyring = None
         self.log = logging.getLogger("SynthMemory")
 
     def setup(self):
-        stores = self.data_dir / "stores"
-        stores.mkdir(parents=True, exist_ok=True)
         try:
             emb = self.window.core.gpt.get_embeddings("test")
             embedding_dim = len(emb)
         except Exception:
             embedding_dim = 1536
-        
-        try: self.vs = FAISSVectorStore(stores / "vector", dimension=embedding_dim)
-        except ImportError: self.vs = NoOpVectorStore(stores / "vector", dimension=embedding_dim)
-        
-        try: self.gs = KuzuGraphStore(stores / "graph", buffer_pool_gb=self.cfg.performance.graph_buffer_pool_gb)
-        except ImportError: self.gs = NoOpGraphStore(stores / "graph", buffer_pool_gb=self.cfg.performance.graph_buffer_gb)
-        
+
         from .retrieval.retriever import HybridMemoryRetriever
         from .broker.event_broker import MemoryIndexer
-        self.broker = MemoryIndexer(self.get_embeddings, self.vs, self.gs, self.cfg)
+        from .retrieval.packing import ContextPacker
+        if self.cfg.daemon.enabled and self._attach_daemon(embedding_dim):
+            self.broker = RemoteIndexer(self.client, self.get_embeddings)
+        else:
+            try:
+                self.stores = StoreBundle(self.data_dir, self.cfg, embedding_dim)
+            except KeyringError as e:
+                # Starting without the keys would seal new rows under keys the real master key cannot open.
+                self.log.error(f"[SynthMemory: Keyring] {e} Memory is disabled for this session.")
+                return
+            self.vs, self.gs, self.keyring = self.stores.vs, self.stores.gs, self.stores.keyring
+            if isinstance(self.stores.hot, FAISSVectorStore) and ReindexPipeline.pending(self.stores.hot):
+                self._start_reindex(self.stores.hot)
+            self.broker = MemoryIndexer(self.get_embeddings, self.vs, self.gs, self.cfg)
         self.retriever = HybridMemoryRetriever(self.vs, self.gs, self.cfg, extractor_fn=self.broker._extract_sync)
+        self.packer = ContextPacker(self.cfg)
+        self._watch_config()
+
+    def _watch_config(self):
+        # With a daemon, it reconfigures (and audits) the stores; this process only follows along.
+        audit = None if self.client else ConfigurationAudit(self.data_dir / "config_audit.jsonl")
+        self.reloader = ConfigurationReloader(self.loader, audit, self.cfg)
+        self.reloader.subscribe(self._apply_config)
+        self.watcher = ConfigurationWatcher(self.loader.config_path, self.reloader.reload, debounce_ms=self.cfg.performance.config_reload_debounce_ms)
+        self.watcher.start()
+
+    def _apply_config(self, old, new):
+        self.cfg = new
+        self.retriever.reconfigure(new)
+        self.packer.cfg = new
+        self.watcher.debounce_s = new.performance.config_reload_debounce_ms / 1000.0
+        if self.stores:
+            self.broker.reconfigure(new)
+            self.stores.reconfigure(new)
+
+    def _attach_daemon(self, embedding_dim: int) -> bool:
+        socket_path = Path(self.cfg.daemon.socket_path or default_socket_path(self.data_dir))
+        try:
+            self.client = connect(self.data_dir, socket_path, embedding_dim, self.cfg)
+        except Exception as e:
+            self.log.error(f"[SynthMemory: Daemon] {e}. Falling back to in-process stores.")
+            return False
+        self.vs = RemoteVectorStore(self.client, embedding_dim)
+        self.gs = RemoteGraphStore(self.client)
+        self.log.info(f"[SynthMemory: Daemon] Using shared memory daemon at {socket_path}.")
+        return True
+
+    def _start_reindex(self, store):
+        async def embed(text: str):
+            return await asyncio.to_thread(self.window.core.gpt.get_embeddings, text)
+
+        perf = self.cfg.performance
+        pipeline = ReindexPipeline(store, embed, batch_size=perf.embedding_batch_size, concurrency=perf.reindex_concurrency, cold=getattr(self.stores.vs, "cold", None))
+
+        def run():
+            try: asyncio.run(pipeline.run())
+            except Exception as e: self.log.error(f"[SynthMemory: Reindex] Paused, will resume on next start: {e}")
+
+        threading.Thread(target=run, daemon=True).start()
 
     def handle(self, event, *args, **kwargs):
         if event.name == 'ctx.begin': self.on_ctx_begin(event.data['ctx'])
         elif event.name == 'post.send':
+            if not self.broker: return
             ctx = event.data['ctx']
             asyncio.run_coroutine_threadsafe(self.broker.on_user_msg(ctx.input, ctx.mode), self.window.threadpool)
 
@@ -54,19 +116,44 @@ class SynthMemoryPlugin(BasePlugin):
             query_vec = np.array(self.window.core.gpt.get_embeddings(ctx.input))
             memories = asyncio.run(self.retriever.retrieve(ctx.input, query_vec, ctx.mode))
             if memories:
-                # Use all returned memories; retriever limits output based on config
-                memo_strings = [m['metadata']['text'] for m in memories]
-                injection = "\n\n[RECALLED SEMANTIC MEMORY]:\n" + "\n".join(memo_strings)
+                injection, stats = self.packer.pack(memories, self._context_window(ctx))
+                self.log.info(f"[SynthMemory: Packing] {stats['packed']}/{stats['candidates']} memories, {stats['used_tokens']}/{stats['budget_tokens']} tokens, saved {stats['saved_tokens']}.")
+                if not injection: return
                 if hasattr(ctx, 'add_memory'): 
                     ctx.add_memory(injection)
                 else: 
                     self.log.warning("[SynthMemory] Host context does not support memory injection; discarding recall.")
         except Exception as e: self.log.error(f"[SynthMemory: Injection] {e}")
 
+    def _context_window(self, ctx) -> int:
+        try:
+            return int(self.window.core.models.get(ctx.model).ctx)
+        except Exception:
+            return self.cfg.retrieval.default_context_window
+
+    def forget(self, mode: str) -> bool:
+        policy = self.cfg.security.forget_policy
+        if policy != "CryptoShred":
+            self.log.warning(f"[SynthMemory] Forget policy '{policy}' is not implemented; namespace '{mode}' left intact.")
+            return False
+        return self.vs is not None and self.vs.shred_namespace(mode) > 0
+
+    def export_memories(self, out_dir: Path, plaintext: bool = False) -> dict:
+        if self.client: return self.client.call_detached("export", str(out_dir), plaintext=plaintext)
+        exporter = MemoryExporter(self.vs, self.gs, self.keyring, chunk_rows=self.cfg.portability.export_chunk_rows, plaintext=plaintext)
+        return exporter.run(Path(out_dir))
+
+    def import_memories(self, in_dir: Path) -> dict:
+        if self.client: return self.client.call_detached("import", str(in_dir))
+        importer = MemoryImporter(self.vs, self.gs, self.keyring, batch_rows=self.cfg.portability.export_chunk_rows)
+        return importer.run(Path(in_dir))
+
     async def get_embeddings(self, text: str): return self.window.core.gpt.get_embeddings(text)
 
     def shutdown(self):
-        # Close graph store first to ensure relation integrity before vector cleanup
-        if self.gs: self.gs.close()
-        if self.vs: self.vs.close()
+        if self.broker: self.log.info(f"[SynthMemory] Ingest dedup: {self.broker.dedup_stats()}")
+        if self.watcher: self.watcher.stop()
+        # The daemon outlives its clients; only in-process stores are closed here.
+        if self.client: self.client.close()
+        if self.stores: self.stores.close()
 Plugin = SynthMemoryPlugin
@@ -3,6 +3,8 @@ SynthMemory Default Prompts
 """
 
 DEFAULT_PROMPTS = {
-    "memory_injection": "\n[RECALLED SEMANTIC MEMORY]:\n{memories}",
+    "memory_injection": "\n\n[RECALLED SEMANTIC MEMORY]:\n{memories}",
+    "memory_item": "{text}",
+    "memory_truncated": "{text} [...]",
     "memory_refining": "Refine the following thoughts based on the provided context...",
 }
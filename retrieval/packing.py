@@ -0,0 +1,82 @@
+import re
+import logging
+from typing import List, Dict, Any, Tuple
+from ..prompts import DEFAULT_PROMPTS
+
+_WORD = re.compile(r"\w+")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+def estimate_tokens(text: str) -> int:
+    """Fast BPE-ish estimate (~4 chars per token) without loading a tokenizer."""
+    return (len(text) + 3) // 4
+
+class ContextPacker:
+    """
+    Fits recalled memories into `retrieval.context_window_injection_ratio` percent of the
+    model's context window. Memories are taken in RRF order, near-duplicates are dropped,
+    and oversized ones are cut at a sentence boundary using the `memory_truncated` template.
+    """
+    def __init__(self, cfg):
+        self.cfg = cfg
+        self.last_stats: Dict[str, int] = {}
+        self.log = logging.getLogger("SynthMemory")
+
+    def budget(self, context_window: int) -> int:
+        return int(context_window * self.cfg.retrieval.context_window_injection_ratio / 100.0)
+
+    @staticmethod
+    def _shingles(text: str) -> set:
+        return set(_WORD.findall(text.lower()))
+
+    def _is_duplicate(self, words: set, kept: List[set]) -> bool:
+        threshold = self.cfg.retrieval.packing_dedup_jaccard
+        for other in kept:
+            union = len(words | other)
+            if union and len(words & other) / union >= threshold: return True
+        return False
+
+    @staticmethod
+    def _truncate(text: str, max_tokens: int) -> str:
+        limit = max_tokens * 4
+        head = ""
+        for sentence in _SENTENCE_END.split(text):
+            candidate = f"{head} {sentence}".strip()
+            if len(candidate) > limit: break
+            head = candidate
+        return head or text[:limit].rstrip()
+
+    def pack(self, memories: List[Dict[str, Any]], context_window: int) -> Tuple[str, Dict[str, int]]:
+        """Returns (injection text, stats). Stats report the tokens saved versus injecting everything."""
+        item_tpl, cut_tpl = DEFAULT_PROMPTS["memory_item"], DEFAULT_PROMPTS["memory_truncated"]
+        texts = [m["metadata"].get("text", "") for m in sorted(memories, key=lambda m: m.get("rrf_score", 0.0), reverse=True)]
+        naive = sum(estimate_tokens(item_tpl.format(text=t)) for t in texts if t)
+
+        budget = self.budget(context_window) - estimate_tokens(DEFAULT_PROMPTS["memory_injection"].format(memories=""))
+        per_memory = self.cfg.retrieval.max_tokens_per_memory
+        lines, kept, used = [], [], 0
+        stats = {"candidates": len(texts), "packed": 0, "duplicates": 0, "truncated": 0, "dropped": 0}
+        for text in texts:
+            if not text: continue
+            words = self._shingles(text)
+            if self._is_duplicate(words, kept):
+                stats["duplicates"] += 1
+                continue
+            line = item_tpl.format(text=text)
+            cost = estimate_tokens(line)
+            room = min(per_memory, budget - used)
+            if cost > room:
+                if room < 16:
+                    stats["dropped"] += 1
+                    continue
+                line = cut_tpl.format(text=self._truncate(text, room - estimate_tokens(cut_tpl.format(text=""))))
+                cost = estimate_tokens(line)
+                stats["truncated"] += 1
+            lines.append(line)
+            kept.append(words)
+            used += cost
+            stats["packed"] += 1
+
+        stats.update(budget_tokens=max(budget, 0), used_tokens=used, naive_tokens=naive, saved_tokens=max(naive - used, 0))
+        self.last_stats = stats
+        if not lines: return "", stats
+        return DEFAULT_PROMPTS["memory_injection"].format(memories="\n".join(lines)), stats
@@ -0,0 +1,35 @@
+import time
+import numpy as np
+from typing import List, Dict, Any, Optional
+
+SECONDS_PER_DAY = 86400.0
+
+def rescore_hits(hits: List[Dict[str, Any]], decay_rate: float, now: Optional[float] = None) -> List[Dict[str, Any]]:
+    """
+    Recency- and confidence-aware rescoring of vector hits in one numpy pass.
+    score = similarity * confidence * exp(-decay_rate * days since last seen), where
+    "last seen" is the later of insertion and last reinforcement. Promoted facts do not decay.
+    Hits are returned re-ordered, which is what the downstream RRF ranks consume.
+    """
+    if not hits: return hits
+    now = time.time() if now is None else now
+    n = len(hits)
+    metas = [h["metadata"] for h in hits]
+    dist = np.fromiter((h["score"] for h in hits), dtype='float64', count=n)
+    born = np.fromiter((h.get("epoch", now) for h in hits), dtype='float64', count=n)
+    seen = np.fromiter((m.get("last_reinforced_t", 0.0) for m in metas), dtype='float64', count=n)
+    conf = np.fromiter((m.get("confidence", 1.0) for m in metas), dtype='float64', count=n)
+    promoted = np.fromiter((bool(m.get("promoted")) for m in metas), dtype=bool, count=n)
+
+    age_days = np.maximum(now - np.maximum(born, seen), 0.0) / SECONDS_PER_DAY
+    decay = np.where(promoted, 1.0, np.exp(-decay_rate * age_days))
+    scores = conf * decay / (1.0 + np.maximum(dist, 0.0))
+
+    order = np.argsort(-scores, kind='stable')
+    out = []
+    for rank, i in enumerate(order):
+        hit = hits[i]
+        hit["decayed_score"] = float(scores[i])
+        hit["rank"] = rank + 1
+        out.append(hit)
+    return out
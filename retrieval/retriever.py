@@ -1,7 +1,10 @@
 import asyncio
+import logging
 import numpy as np
-from typing import List, Dict, Any, Callable
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Callable, Optional
 from collections import defaultdict
+from .rescoring import rescore_hits
 
 class HybridMemoryRetriever:
     """
@@ -14,16 +17,29 @@ class HybridMemoryRetriever:
         self.extractor_fn = extractor_fn
         self.log = logging.getLogger("SynthMemory")
 
-    async def retrieve(self, query: str, query_vec: np.ndarray, mode: str = "default") -> List[Dict[str, Any]]:
-        v_k = self.cfg.retrieval.vector_k
-        g_depth = self.cfg.retrieval.graph_depth_traversal
-        vector_task = asyncio.to_thread(self.vs.search, query_vec, k=v_k * 2)
+    def reconfigure(self, config):
+        """Swaps in a reloaded config; queries already running finish on the one they started with."""
+        self.cfg = config
+
+    async def retrieve(self, query: str, query_vec: np.ndarray, mode: str = "default", since: Optional[datetime] = None, as_of: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """
+        `since` / `as_of` bound recall to a time window; whole segments outside it are skipped.
+        Without an explicit `since`, `retrieval.recency_window_days` (if set) applies.
+        Reads one config snapshot, so a live reload never mixes old and new parameters in a query.
+        """
+        cfg = self.cfg
+        v_k = cfg.retrieval.vector_k
+        g_depth = cfg.retrieval.graph_depth_traversal
+        window = cfg.retrieval.recency_window_days
+        if since is None and window:
+            since = (as_of or datetime.now()) - timedelta(days=window)
+        vector_task = asyncio.to_thread(self.vs.search, query_vec, k=v_k * 2, since=since, as_of=as_of)
         
         g_entry = ""
         if self.extractor_fn:
             try:
                 # Get timeout from config, defaulting to 2.0s if missing
-                timeout_sec = getattr(self.cfg.performance, 'ner_extraction_timeout_ms', 2000) / 1000.0
+                timeout_sec = getattr(cfg.performance, 'ner_extraction_timeout_ms', 2000) / 1000.0
                 
                 # Watchdog: Offload NER to thread, but enforce hard deadline
                 entities = await asyncio.wait_for(
@@ -43,12 +59,17 @@ class HybridMemoryRetriever:
                 self.log.debug(f"[SynthMemory: Retriever] Extraction error: {e}")
                 pass
         
-        graph_task = asyncio.to_thread(self.gs.traverse_bounded, g_entry, depth=g_depth) if g_entry else asyncio.sleep(0, [])
+        temporal = cfg.truth.enable_temporal_invalidation
+        at = as_of.isoformat() if as_of else None
+        graph_task = asyncio.to_thread(self.gs.traverse_bounded, g_entry, depth=g_depth, as_of=at, temporal=temporal) if g_entry else asyncio.sleep(0, [])
         v_hits, g_hits = await asyncio.gather(vector_task, graph_task)
-        return self._rrf_merge(v_hits or [], g_hits or [])
+        now = as_of.timestamp() if as_of else None
+        v_hits = rescore_hits(v_hits or [], cfg.truth.confidence_decay_rate, now=now)
+        return self._rrf_merge(v_hits, g_hits or [], cfg)
 
-    def _rrf_merge(self, v_hits: List[Dict], g_hits: List[Dict]) -> List[Dict[str, Any]]:
-        k = self.cfg.retrieval.rrf_k_parameter
+    def _rrf_merge(self, v_hits: List[Dict], g_hits: List[Dict], cfg=None) -> List[Dict[str, Any]]:
+        cfg = cfg or self.cfg
+        k = cfg.retrieval.rrf_k_parameter
         scores = defaultdict(float)
         meta_cache = {}
 
@@ -71,7 +92,7 @@ class HybridMemoryRetriever:
                 }
 
         # Fusion Window: Use actual hit counts, capped to context ceiling
-        baseline_limit = int(self.cfg.retrieval.vector_k) if self.cfg else 5
+        baseline_limit = int(cfg.retrieval.vector_k) if cfg else 5
         # Ensure we don't bloat the context if graph returns many nodes, but allow graph to expand beyond vector_k slightly
         limit = min(baseline_limit + len(g_hits), baseline_limit * 2)
         
@@ -0,0 +1,222 @@
+import os
+import json
+import pickle
+import shutil
+import hashlib
+import threading
+import logging
+from pathlib import Path
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional
+
+class IncrementalBackup:
+    """
+    Local daily backups whose cost follows the change since the previous backup.
+    Every backup is a complete, directly restorable tree, but files whose (size, mtime)
+    are unchanged since the previous backup are hard-linked from it instead of copied.
+    Segment files only change when their time window receives writes, and the metadata
+    pickle is stored as fixed-size row chunks keyed by digest, so a day of ingest
+    rewrites the active segments and the tail chunks rather than the whole store.
+    Cold shards are immutable and cost nothing once backed up. The graph is the exception:
+    Kùzu rewrites its files in place, so they are copied in full into the backup on every
+    run (the only step that holds off graph writers and traversals), then hashed; files
+    matching the previous backup are replaced by hard links. A graph that changed at all
+    costs its full size.
+    """
+    def __init__(self, stores_dir: Path, backup_dir: Path, vs=None, gs=None, retention: int = 7, meta_chunk_rows: int = 4096):
+        self.stores_dir = stores_dir
+        self.backup_dir = backup_dir
+        self.hot = getattr(vs, "hot", vs)
+        self.cold = getattr(vs, "cold", None)
+        self.gs = gs
+        self.retention = retention
+        self.meta_chunk_rows = meta_chunk_rows
+        self.log = logging.getLogger("SynthMemory")
+
+    def backups(self):
+        """Completed backups, oldest first."""
+        if not self.backup_dir.exists(): return []
+        return sorted(p for p in self.backup_dir.iterdir() if (p / "manifest.json").exists())
+
+    def last_created(self) -> Optional[datetime]:
+        done = self.backups()
+        if not done: return None
+        with open(done[-1] / "manifest.json") as f:
+            return datetime.fromisoformat(json.load(f)["created"])
+
+    def due(self, interval_s: int) -> bool:
+        last = self.last_created()
+        return last is None or datetime.now() - last >= timedelta(seconds=interval_s)
+
+    def _take_file(self, src: Path, rel: str, target: Path, prev: Optional[Path], prev_files: Dict, files: Dict, stats: Dict):
+        dest = target / rel
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        # One open file: a concurrent atomic replace cannot tear the copy or its stat.
+        with open(src, 'rb') as f:
+            st = os.fstat(f.fileno())
+            sig = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+            if prev is not None and prev_files.get(rel) == sig and self._link(prev / rel, dest):
+                stats["linked"] += 1
+            else:
+                with open(dest, 'wb') as out:
+                    shutil.copyfileobj(f, out)
+                stats["copied"] += 1
+                stats["bytes"] += st.st_size
+        files[rel] = sig
+
+    def _take_staged(self, staged: Path, rel: str, target: Path, prev: Optional[Path], prev_files: Dict, files: Dict, stats: Dict):
+        """Moves a private snapshot copy into place, or links the previous backup's file when the content matches."""
+        dest = target / rel
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        digest = hashlib.sha1()
+        with open(staged, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        size = staged.stat().st_size
+        sig = {"size": size, "sha1": digest.hexdigest()}
+        if prev is not None and prev_files.get(rel) == sig and self._link(prev / rel, dest):
+            staged.unlink()
+            stats["linked"] += 1
+        else:
+            os.replace(staged, dest)
+            stats["copied"] += 1
+            stats["bytes"] += size
+        files[rel] = sig
+
+    def _take_blob(self, blob: bytes, rel: str, target: Path, prev: Optional[Path], prev_files: Dict, files: Dict, stats: Dict):
+        dest = target / rel
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        sig = {"sha1": hashlib.sha1(blob).hexdigest()}
+        if prev is not None and prev_files.get(rel) == sig and self._link(prev / rel, dest):
+            stats["linked"] += 1
+        else:
+            dest.write_bytes(blob)
+            stats["copied"] += 1
+            stats["bytes"] += len(blob)
+        files[rel] = sig
+
+    @staticmethod
+    def _link(src: Path, dest: Path) -> bool:
+        try:
+            os.link(src, dest)
+            return True
+        except OSError:
+            return False
+
+    def run(self) -> Dict[str, Any]:
+        done = self.backups()
+        prev = done[-1] if done else None
+        prev_files = {}
+        if prev is not None:
+            with open(prev / "manifest.json") as f:
+                prev_files = json.load(f)["files"]
+        created = datetime.now()
+        stamp = created.strftime("%Y%m%d-%H%M%S")
+        name, seq = stamp, 1
+        while (self.backup_dir / name).exists():
+            name, seq = f"{stamp}-{seq}", seq + 1
+        target = self.backup_dir / (name + ".partial")
+        target.mkdir(parents=True, exist_ok=True)
+        files, stats = {}, {"copied": 0, "linked": 0, "bytes": 0}
+        take = lambda src, rel: self._take_file(src, rel, target, prev, prev_files, files, stats)
+
+        if self.hot is not None and hasattr(self.hot, "seg_dir"):
+            # Holding the store's I/O lock keeps segment files and metadata from the same persist.
+            with self.hot._io_lock:
+                for path in sorted(self.hot.seg_dir.glob("*.index")):
+                    take(path, f"vector/segments/{path.name}")
+                with self.hot.lock:
+                    metadata = self.hot.metadata[:self.hot._snap.n]
+                for n, start in enumerate(range(0, len(metadata), self.meta_chunk_rows)):
+                    blob = pickle.dumps(metadata[start:start + self.meta_chunk_rows], protocol=4)
+                    self._take_blob(blob, f"vector/meta/{n:06d}.pkl", target, prev, prev_files, files, stats)
+        if self.cold is not None:
+            with self.cold.lock:
+                # Shards are immutable once written, so unchanged ones are hard-linked from the previous backup.
+                for path in self.cold.files():
+                    take(path, f"cold/{path.relative_to(self.cold.index_dir).as_posix()}")
+        if self.gs is not None and Path(self.gs.db_path).exists():
+            db_path = Path(self.gs.db_path)
+            staging = target / ".graph"
+            staged = {}
+            # Only the copy runs under the graph lock; hashing and linking happen after it is released.
+            staging.mkdir()
+            with self.gs.frozen():
+                paths = sorted(p for p in db_path.rglob("*") if p.is_file()) if db_path.is_dir() else [db_path]
+                for n, path in enumerate(paths):
+                    rel = f"graph/{path.relative_to(db_path)}" if db_path.is_dir() else "graph"
+                    staged[rel] = staging / str(n)
+                    shutil.copyfile(path, staged[rel])
+            for rel, copy in staged.items():
+                self._take_staged(copy, rel, target, prev, prev_files, files, stats)
+            shutil.rmtree(staging, ignore_errors=True)
+        keys = self.stores_dir / "keys.json"
+        if keys.exists(): take(keys, "keys.json")
+
+        manifest = {"created": created.isoformat(), "base": prev.name if prev else None, "files": files, **stats}
+        with open(target / "manifest.json", 'w') as f:
+            json.dump(manifest, f, indent=2)
+        final = self.backup_dir / name
+        target.rename(final)
+        self._prune()
+        self.log.info(f"[SynthMemory: Backup] {final.name}: copied {stats['copied']} file(s) ({stats['bytes']} bytes), linked {stats['linked']} unchanged.")
+        return manifest
+
+    def _prune(self):
+        for stale in self.backup_dir.glob("*.partial"):
+            shutil.rmtree(stale, ignore_errors=True)
+        done = self.backups()
+        for old in done[:max(0, len(done) - self.retention)]:
+            shutil.rmtree(old, ignore_errors=True)
+
+    @staticmethod
+    def restore(backup: Path, stores_dir: Path) -> Path:
+        """
+        Rebuilds a stores directory from one backup. Must run while the plugin is stopped;
+        the current stores directory is moved aside, not deleted. Returns its new path.
+        """
+        with open(backup / "manifest.json") as f:
+            manifest = json.load(f)
+        aside = stores_dir.with_name(f"{stores_dir.name}.pre-restore-{datetime.now().strftime('%Y%m%d%H%M%S')}")
+        if stores_dir.exists(): stores_dir.rename(aside)
+        stores_dir.mkdir(parents=True)
+        metadata = []
+        for rel in sorted(manifest["files"]):
+            if rel.startswith("vector/meta/"):
+                with open(backup / rel, 'rb') as f:
+                    metadata.extend(pickle.load(f))
+                continue
+            dest = stores_dir / rel
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(backup / rel, dest)
+        if any(rel.startswith("vector/") for rel in manifest["files"]):
+            (stores_dir / "vector").mkdir(parents=True, exist_ok=True)
+            with open(stores_dir / "vector" / "vector.meta", 'wb') as f:
+                pickle.dump(metadata, f)
+        return aside
+
+class BackupScheduler:
+    """Background thread that takes an IncrementalBackup whenever the last one is older than `interval_s`."""
+    def __init__(self, backup: IncrementalBackup, interval_s: int = 86400, check_s: int = 3600):
+        self.backup = backup
+        self.interval_s = interval_s
+        self.check_s = check_s
+        self.log = logging.getLogger("SynthMemory")
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive(): return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def _loop(self):
+        while not self._stop.wait(self.check_s):
+            try:
+                if self.backup.due(self.interval_s): self.backup.run()
+            except Exception as e:
+                self.log.error(f"[SynthMemory: Backup] {e}")
+
+    def stop(self):
+        self._stop.set()
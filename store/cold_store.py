@@ -0,0 +1,364 @@
+import os
+import math
+import json
+import mmap
+import pickle
+import shutil
+import threading
+import logging
+import bisect
+import numpy as np
+from pathlib import Path
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple
+from .vector_store import open_sealed_hits, plaintext_rows, to_epoch, train_ivfpq
+
+try:
+    import faiss
+except ImportError:
+    faiss = None
+
+# Compaction merges the newest SHARD_FANOUT shards once they are all of the same size class,
+# so the shard count stays logarithmic in the archive size and every row is rewritten O(log n) times.
+SHARD_FANOUT = 4
+_SHARD_SUFFIXES = (".index", ".ts.npy", ".kid.npy", ".off.npy", ".meta")
+
+def _level(rows: int) -> int:
+    return int(math.log(max(rows, 1), SHARD_FANOUT))
+
+class _ColdShard:
+    """
+    One immutable batch of archived rows. Codes, per-row epochs and pickled metadata are all
+    memory-mapped, so RAM holds only the pages a search touches. Mappings outlive the files,
+    so readers of an older view are unaffected when compaction deletes them.
+    """
+    __slots__ = ("name", "start", "n", "min_t", "max_t", "index", "epochs", "kids", "offsets", "blob", "_dead")
+
+    def __init__(self, shard_dir: Path, entry: Dict[str, Any], nprobe: int):
+        self.name, self.start, self.n = entry["name"], entry["start"], entry["n"]
+        self.min_t, self.max_t = entry["min_t"], entry["max_t"]
+        base = shard_dir / self.name
+        self.index = faiss.read_index(str(base.with_suffix(".index")), faiss.IO_FLAG_MMAP)
+        self.index.nprobe = nprobe
+        self.epochs = np.load(base.with_suffix(".ts.npy"), mmap_mode='r')
+        self.kids = np.load(base.with_suffix(".kid.npy"), mmap_mode='r')
+        self.offsets = np.load(base.with_suffix(".off.npy"), mmap_mode='r')
+        with open(base.with_suffix(".meta"), 'rb') as f:
+            self.blob = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._dead = (frozenset(), np.empty(0, dtype='int64'))
+
+    def entry(self) -> Dict[str, Any]:
+        return {"name": self.name, "start": self.start, "n": self.n, "min_t": self.min_t, "max_t": self.max_t}
+
+    def meta(self, local: int) -> Dict:
+        return pickle.loads(self.blob[int(self.offsets[local]):int(self.offsets[local + 1])])
+
+    def overlaps(self, lo: float, hi: float) -> bool:
+        return self.max_t >= lo and self.min_t <= hi
+
+    def dead_rows(self, dead_kids: frozenset) -> np.ndarray:
+        """Local rows sealed under the given (shredded) key codes; cached until the set changes."""
+        if self._dead[0] != dead_kids:
+            rows = np.nonzero(np.isin(self.kids, list(dead_kids)))[0].astype('int64') if dead_kids else np.empty(0, dtype='int64')
+            self._dead = (dead_kids, rows)
+        return self._dead[1]
+
+class ColdArchive:
+    """
+    Compressed, memory-mapped archive tier for old memories.
+    Vectors are stored as IVF-PQ codes (`code_bytes` per vector instead of 4*d) against one
+    codebook trained on the first archived batch. Every tier move writes a new shard (codes,
+    epochs and metadata) and never touches existing ones; small shards are compacted into
+    larger ones, so a move costs IO proportional to the rows it moves, amortized over the
+    log-many compactions each row takes part in. `manifest.json` names the live shards and
+    is replaced atomically, so a crash leaves either the old or the new set. Searches read
+    an immutable tuple of shards and keep working while a new one is published.
+    Every row records a code for its data key id, so rows whose key was shredded are
+    excluded inside the search instead of taking top-k slots.
+    """
+    def __init__(self, index_dir: Path, dimension: int, keyring=None, code_bytes: int = 64, min_train_rows: int = 1024, nprobe: int = 8):
+        self.log = logging.getLogger("SynthMemory")
+        if faiss is None:
+            raise ImportError("FAISS is not available. Please install faiss-cpu.")
+        self.index_dir = index_dir
+        self.shard_dir = index_dir / "shards"
+        self.manifest_file = index_dir / "manifest.json"
+        self.codebook_file = index_dir / "codebook.index"
+        self.dimension = dimension
+        self.keyring = keyring
+        self.code_bytes = code_bytes
+        self.min_train_rows = min_train_rows
+        self.nprobe = nprobe
+        self._codebook = None
+        self._shards: Tuple[_ColdShard, ...] = ()
+        # Shards at another embedding dimension: not searched, kept until re-embedded (see rebuild).
+        self._stale: Tuple[_ColdShard, ...] = ()
+        self._generation = 0
+        # Data key id -> code stored per row in the shards' .kid.npy; -1 is plaintext.
+        self._kid_codes: Dict[str, int] = {}
+        # Token of the re-embedding that produced this archive, so a resumed run does not redo it.
+        self.rebuilt: Optional[str] = None
+        self._disabled = False
+        self.lock = threading.Lock()
+        self._load()
+
+    @property
+    def ntotal(self) -> int:
+        return sum(s.n for s in self._shards)
+
+    @property
+    def disabled(self) -> bool:
+        return self._disabled
+
+    @staticmethod
+    def _meta_epoch(meta: Dict) -> float:
+        try:
+            return datetime.fromisoformat(meta["ts"]).timestamp()
+        except (KeyError, TypeError, ValueError):
+            return 0.0
+
+    def files(self) -> List[Path]:
+        """Every file of the current archive, manifest last; for backups (hold `lock`)."""
+        if not self.manifest_file.exists(): return []
+        out = [self.codebook_file]
+        for shard in self._shards:
+            base = self.shard_dir / shard.name
+            out.extend(base.with_suffix(s) for s in _SHARD_SUFFIXES)
+        return out + [self.manifest_file]
+
+    def overlaps(self, since: Optional[float] = None, as_of: Optional[float] = None, shards: Optional[Tuple[_ColdShard, ...]] = None) -> bool:
+        """False when the whole archive lies outside the requested time window."""
+        shards = self._shards if shards is None else shards
+        lo = since if since is not None else float("-inf")
+        hi = as_of if as_of is not None else float("inf")
+        return any(s.overlaps(lo, hi) for s in shards)
+
+    def can_accept(self, n: int) -> bool:
+        # An untrained archive needs enough rows in one batch to train its codebooks.
+        if self._disabled: return False
+        return self._codebook is not None or n >= self.min_train_rows
+
+    # --- Writes -----------------------------------------------------------------
+    def _new_name(self, start: int) -> str:
+        self._generation += 1
+        return f"{start:012d}-{self._generation:06d}"
+
+    def _kid_code(self, meta: Dict) -> int:
+        if "kid" not in meta: return -1
+        return self._kid_codes.setdefault(meta["kid"], len(self._kid_codes))
+
+    def _dead_kids(self) -> frozenset:
+        if not self.keyring: return frozenset()
+        return frozenset(code for kid, code in self._kid_codes.items() if not self.keyring.is_live(kid))
+
+    def _write_shard(self, name: str, index, epochs: np.ndarray, kids: np.ndarray, offsets: np.ndarray, blobs) -> None:
+        base = self.shard_dir / name
+        faiss.write_index(index, str(base.with_suffix(".index")))
+        np.save(base.with_suffix(".ts.npy"), epochs)
+        np.save(base.with_suffix(".kid.npy"), kids)
+        np.save(base.with_suffix(".off.npy"), offsets)
+        with open(base.with_suffix(".meta"), 'wb') as f:
+            for blob in blobs: f.write(blob)
+
+    def _commit(self, shards: Tuple[_ColdShard, ...], obsolete: List[str]):
+        """Publishes `shards` via an atomic manifest replace, then removes files no longer named."""
+        manifest = {"dimension": self.dimension, "generation": self._generation, "rebuild": self.rebuilt,
+                    "kids": sorted(self._kid_codes, key=self._kid_codes.get), "shards": [s.entry() for s in shards]}
+        tmp = self.manifest_file.with_suffix(".tmp")
+        with open(tmp, 'w') as f:
+            json.dump(manifest, f)
+        os.replace(tmp, self.manifest_file)
+        self._shards = shards
+        for name in obsolete: self._remove_shard_files(name)
+
+    def _remove_shard_files(self, name: str):
+        for suffix in _SHARD_SUFFIXES:
+            (self.shard_dir / name).with_suffix(suffix).unlink(missing_ok=True)
+
+    def append(self, vectors: np.ndarray, metas: List[Dict], compact: bool = True):
+        """
+        Adds rows to the archive as a new shard. Vectors are compressed; metadata is kept as
+        sealed by the hot tier. `compact=False` leaves merging to a later compact() call.
+        """
+        if vectors.shape[0] == 0: return
+        vectors = np.ascontiguousarray(vectors, dtype='float32')
+        with self.lock:
+            self.shard_dir.mkdir(parents=True, exist_ok=True)
+            if self._codebook is None:
+                self._codebook = self._train(vectors)
+                tmp = self.codebook_file.with_suffix(".tmp")
+                faiss.write_index(self._codebook, str(tmp))
+                os.replace(tmp, self.codebook_file)
+            start = self._shards[-1].start + self._shards[-1].n if self._shards else 0
+            index = faiss.clone_index(self._codebook)
+            index.add_with_ids(vectors, np.arange(vectors.shape[0], dtype='int64'))
+            blobs = [pickle.dumps(m, protocol=4) for m in metas]
+            offsets = np.concatenate([[0], np.cumsum([len(b) for b in blobs])]).astype('int64')
+            epochs = np.array([self._meta_epoch(m) for m in metas], dtype='float64')
+            kids = np.array([self._kid_code(m) for m in metas], dtype='int32')
+            name = self._new_name(start)
+            self._write_shard(name, index, epochs, kids, offsets, blobs)
+            entry = {"name": name, "start": start, "n": len(metas), "min_t": float(epochs.min()), "max_t": float(epochs.max())}
+            self._commit(self._shards + (_ColdShard(self.shard_dir, entry, self.nprobe),), [])
+            if compact: self._compact()
+
+    def compact(self):
+        with self.lock:
+            if self._codebook is not None: self._compact()
+
+    def _compact(self):
+        """Merges the newest SHARD_FANOUT shards while they share a size class (hold `lock`)."""
+        while len(self._shards) >= SHARD_FANOUT:
+            tail = self._shards[-SHARD_FANOUT:]
+            if len({_level(s.n) for s in tail}) != 1: return
+            start = tail[0].start
+            merged = faiss.clone_index(self._codebook)
+            for shard in tail:
+                # merge_from drains its source, so it needs a private (unmapped) copy.
+                merged.merge_from(faiss.read_index(str((self.shard_dir / shard.name).with_suffix(".index"))), shard.start - start)
+            epochs = np.concatenate([np.asarray(s.epochs) for s in tail])
+            kids = np.concatenate([np.asarray(s.kids) for s in tail])
+            offsets, blobs, base = [0], [], 0
+            for shard in tail:
+                offsets.extend((np.asarray(shard.offsets[1:]) + base).tolist())
+                base += int(shard.offsets[-1])
+                blobs.append(shard.blob[:])
+            name = self._new_name(start)
+            self._write_shard(name, merged, epochs, kids, np.asarray(offsets, dtype='int64'), blobs)
+            entry = {"name": name, "start": start, "n": sum(s.n for s in tail),
+                     "min_t": min(s.min_t for s in tail), "max_t": max(s.max_t for s in tail)}
+            self._commit(self._shards[:-SHARD_FANOUT] + (_ColdShard(self.shard_dir, entry, self.nprobe),), [s.name for s in tail])
+
+    def _train(self, vectors: np.ndarray):
+        return train_ivfpq(vectors, self.dimension, self.code_bytes)
+
+    # --- Reads ------------------------------------------------------------------
+    def search(self, query_vector: np.ndarray, k: int = 5, since=None, as_of=None) -> List[Dict[str, Any]]:
+        since, as_of = to_epoch(since), to_epoch(as_of)
+        shards = self._shards
+        lo = since if since is not None else float("-inf")
+        hi = as_of if as_of is not None else float("inf")
+        q = query_vector.astype('float32').reshape(1, -1)
+        dead_kids = self._dead_kids()
+        found = []
+        for shard in shards:
+            if not shard.overlaps(lo, hi): continue
+            dead = shard.dead_rows(dead_kids)
+            if shard.min_t >= lo and shard.max_t <= hi:
+                if dead.size == shard.n: continue
+                params = faiss.SearchParametersIVF(nprobe=self.nprobe)
+                if dead.size:
+                    # IDSelectorNot only borrows its inner selector, so both stay referenced here.
+                    shredded = faiss.IDSelectorBatch(dead)
+                    params = faiss.SearchParametersIVF(sel=faiss.IDSelectorNot(shredded), nprobe=self.nprobe)
+            else:
+                allowed = np.nonzero((shard.epochs >= lo) & (shard.epochs <= hi))[0].astype('int64')
+                if dead.size: allowed = np.setdiff1d(allowed, dead, assume_unique=True)
+                if allowed.size == 0: continue
+                params = faiss.SearchParametersIVF(sel=faiss.IDSelectorBatch(allowed), nprobe=self.nprobe)
+            distances, indices = shard.index.search(q, k, params=params)
+            found.extend((float(d), shard, int(i)) for d, i in zip(distances[0], indices[0]) if 0 <= i < shard.n)
+        found.sort(key=lambda hit: hit[0])
+        # Metadata is read (and unpickled) only for the k rows that are returned.
+        results = [{
+            "metadata": shard.meta(i),
+            "score": dist,
+            "rank": rank + 1,
+            "epoch": float(shard.epochs[i]),
+            "tier": "cold"
+        } for rank, (dist, shard, i) in enumerate(found[:k])]
+        return open_sealed_hits(self.keyring, results)
+
+    def iter_rows(self, chunk_rows: int = 4096):
+        """Streams (ids, decoded vectors, metas) of archived rows, one shard at a time. PQ decoding is lossy."""
+        for shard in self._shards:
+            # Decoding needs a direct map, which the shared read-only mapping must not grow.
+            index = faiss.read_index(str((self.shard_dir / shard.name).with_suffix(".index")), faiss.IO_FLAG_MMAP)
+            index.make_direct_map()
+            for local in range(0, shard.n, chunk_rows):
+                count = min(chunk_rows, shard.n - local)
+                ids = np.arange(shard.start + local, shard.start + local + count, dtype='int64')
+                yield ids, index.reconstruct_n(local, count), [shard.meta(i) for i in range(local, local + count)]
+
+    def memory_ids(self):
+        """Memory ids of the archived rows, read from the shard metadata without decoding vectors."""
+        for shard in self._shards:
+            for local in range(shard.n):
+                meta = shard.meta(local)
+                if "id" in meta: yield meta["id"]
+
+    # --- Re-embedding (see store/reindex.py) ----------------------------------------
+    @property
+    def reindex_rows(self) -> int:
+        """Rows a re-embedding reads: the stale shards after a dimension change, else the live ones."""
+        return sum(s.n for s in (self._stale or self._shards))
+
+    def _source_meta(self, row: int) -> Dict:
+        shards = self._stale or self._shards
+        shard = shards[bisect.bisect_right([s.start for s in shards], row) - 1]
+        return shard.meta(row - shard.start)
+
+    def source_rows(self, start: int, stop: int) -> List[Tuple[int, str]]:
+        """Plaintext of archived rows in [start, stop), decrypted in one batch."""
+        stop = min(stop, self.reindex_rows)
+        return plaintext_rows(self.keyring, [(i, self._source_meta(i)) for i in range(start, stop)])
+
+    def rebuild(self, batches, token: Optional[str] = None):
+        """
+        Replaces the archive with re-embedded rows, given as (source row ids, vectors) batches.
+        The new archive is built next to the old one and swapped in by directory rename;
+        rows missing from `batches` (shredded) are dropped. `token` is kept as `rebuilt`.
+        """
+        stage = self.index_dir.with_name(self.index_dir.name + ".reindex")
+        aside = self.index_dir.with_name(self.index_dir.name + ".old")
+        shutil.rmtree(stage, ignore_errors=True)
+        fresh = ColdArchive(stage, self.dimension, self.keyring, self.code_bytes, self.min_train_rows, self.nprobe)
+        fresh.rebuilt = token
+        vectors, metas = [], []
+        for ids, batch in batches:
+            vectors.append(batch)
+            metas.extend(self._source_meta(int(i)) for i in ids)
+            # The first append trains the codebook, so hold rows back until there are enough.
+            if fresh._codebook is None and len(metas) < self.min_train_rows: continue
+            fresh.append(np.vstack(vectors), metas)
+            vectors, metas = [], []
+        if metas: fresh.append(np.vstack(vectors), metas)
+        fresh.close()
+        with self.lock:
+            shutil.rmtree(aside, ignore_errors=True)
+            self.index_dir.rename(aside)
+            stage.rename(self.index_dir)
+            shutil.rmtree(aside, ignore_errors=True)
+            self._shards, self._stale, self._codebook, self._disabled = (), (), None, False
+            self._load()
+        self.log.info(f"[SynthMemory: ColdArchive] Re-embedded {self.ntotal} archived rows at dimension {self.dimension}.")
+
+    # --- Loading ----------------------------------------------------------------
+    def _load(self):
+        aside = self.index_dir.with_name(self.index_dir.name + ".old")
+        if aside.exists() and not self.index_dir.exists():
+            # A rebuild stopped between its two renames; the old archive is still complete.
+            aside.rename(self.index_dir)
+        elif aside.exists():
+            shutil.rmtree(aside, ignore_errors=True)
+        if not self.manifest_file.exists(): return
+        with open(self.manifest_file) as f:
+            manifest = json.load(f)
+        self._codebook = faiss.read_index(str(self.codebook_file))
+        if self._codebook.d != self.dimension:
+            self.log.error(f"[SynthMemory: ColdArchive] Dimension mismatch: Expected {self.dimension}, got {self._codebook.d}. Cold tier disabled until re-embedded.")
+            self._codebook, self._disabled = None, True
+            self._stale = tuple(_ColdShard(self.shard_dir, entry, self.nprobe) for entry in manifest["shards"])
+            return
+        self._generation = manifest.get("generation", 0)
+        self._kid_codes = {kid: code for code, kid in enumerate(manifest.get("kids", []))}
+        self.rebuilt = manifest.get("rebuild")
+        self._shards = tuple(_ColdShard(self.shard_dir, entry, self.nprobe) for entry in manifest["shards"])
+        # Shards written by a move or compaction that crashed before its manifest replace.
+        live = {s.name for s in self._shards}
+        for path in self.shard_dir.glob("*"):
+            if path.name.split(".")[0] not in live: path.unlink(missing_ok=True)
+
+    def close(self):
+        with self.lock:
+            self._shards, self._stale = (), ()
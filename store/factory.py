@@ -0,0 +1,75 @@
+import logging
+from pathlib import Path
+from .vector_store import FAISSVectorStore, NoOpVectorStore
+from .graph_store import KuzuGraphStore, NoOpGraphStore
+from .cold_store import ColdArchive
+from .tiered_store import TieredVectorStore, TierMover
+from .backup import IncrementalBackup, BackupScheduler
+from ..utils.encryption import NamespaceKeyring
+
+class StoreBundle:
+    """
+    The stores of one data directory plus the background services that maintain them
+    (tier mover, daily backups). Built by the in-process plugin and by the memory daemon,
+    so both modes open exactly the same layout.
+    """
+    def __init__(self, data_dir: Path, cfg, dimension: int):
+        self.log = logging.getLogger("SynthMemory")
+        self.mover, self.backups = None, None
+        stores = data_dir / "stores"
+        stores.mkdir(parents=True, exist_ok=True)
+
+        self.keyring = None
+        if cfg.security.encrypt_at_rest:
+            # The master key lives outside stores/ so backups and restores never carry it.
+            self.keyring = NamespaceKeyring(stores / "keys.json", cache_size=cfg.security.key_cache_size, master_file=data_dir / "master.key")
+
+        perf = cfg.performance
+        try: self.vs = FAISSVectorStore(stores / "vector", dimension=dimension, keyring=self.keyring, segment_window=perf.segment_window, max_segment_rows=perf.max_segment_rows, index_type=perf.vector_index_type)
+        except ImportError: self.vs = NoOpVectorStore(stores / "vector", dimension=dimension)
+        if isinstance(self.vs, FAISSVectorStore) and self.vs._pending_migrations(self.vs.segments):
+            self.vs.schedule_migration()
+
+        lc = cfg.lifecycle
+        if lc.tiering_enabled and isinstance(self.vs, FAISSVectorStore):
+            cold = ColdArchive(stores / "cold", dimension, keyring=self.keyring, code_bytes=lc.cold_pq_bytes, min_train_rows=lc.cold_min_train_rows)
+            # An archive at the old dimension is re-embedded along with the hot tier.
+            if cold.disabled: self.vs.request_reindex()
+            self.vs = TieredVectorStore(self.vs, cold, cfg)
+            self.mover = TierMover(self.vs, lc.mover_interval_s)
+            self.mover.start()
+
+        try: self.gs = KuzuGraphStore(stores / "graph", buffer_pool_gb=cfg.performance.graph_buffer_pool_gb)
+        except ImportError: self.gs = NoOpGraphStore(stores / "graph", buffer_pool_gb=cfg.performance.graph_buffer_pool_gb)
+
+        port = cfg.portability
+        if port.backup_strategy == "LocalDaily":
+            backup = IncrementalBackup(stores, data_dir / "backups", self.vs, self.gs, retention=port.backup_retention)
+            self.backups = BackupScheduler(backup)
+            self.backups.start()
+
+    @property
+    def hot(self):
+        """The full-precision vector store, unwrapped from the tiering layer."""
+        return self.vs.hot if isinstance(self.vs, TieredVectorStore) else self.vs
+
+    def reconfigure(self, cfg):
+        """Applies a reloaded config to the open stores; an index type change migrates in the background."""
+        hot = self.hot
+        if isinstance(hot, FAISSVectorStore):
+            perf = cfg.performance
+            hot.segment_window, hot.max_segment_rows = perf.segment_window, perf.max_segment_rows
+            index_type = getattr(perf.vector_index_type, "value", perf.vector_index_type)
+            if index_type != hot.index_type:
+                self.log.info(f"[SynthMemory: Stores] Migrating vector segments from {hot.index_type} to {index_type}.")
+                hot.schedule_migration(index_type)
+        if isinstance(self.vs, TieredVectorStore): self.vs.cfg = cfg
+        if self.mover: self.mover.reconfigure(cfg.lifecycle.mover_interval_s)
+        if self.backups: self.backups.backup.retention = cfg.portability.backup_retention
+
+    def close(self):
+        if self.mover: self.mover.stop()
+        if self.backups: self.backups.stop()
+        # Close graph store first to ensure relation integrity before vector cleanup
+        if self.gs: self.gs.close()
+        if self.vs: self.vs.close()
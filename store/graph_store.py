@@ -1,4 +1,7 @@
 import os
+import csv
+import tempfile
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime
 from typing import Optional, List, Dict, Any
@@ -27,16 +30,42 @@ class NoOpGraphStore:
     def get_community_id(self, entity_id: str) -> Optional[int]:
         return None
 
-    def traverse_bounded(self, start_id: str, depth: int = 2, limit: int = 50) -> List[Dict[str, Any]]:
+    def traverse_bounded(self, start_id: str, depth: int = 2, limit: int = 50, as_of: Optional[str] = None, temporal: bool = True) -> List[Dict[str, Any]]:
         return []
 
+    def export_csv(self, out_dir: Path) -> Dict[str, str]:
+        return {}
+
+    def import_csv(self, in_dir: Path, files: Dict[str, str]) -> None:
+        pass
+
+    @contextmanager
+    def frozen(self):
+        yield
+
     def close(self):
         if not self._closed:
             self._closed = True
 
+# Table -> projection used for bulk export. Column order matches the CREATE statements,
+# which is what COPY FROM expects (rel tables lead with the FROM/TO primary keys).
+_EXPORT_QUERIES = {
+    "Entity": "MATCH (e:Entity) RETURN e.id AS id, e.name AS name, e.type AS type",
+    "Community": "MATCH (c:Community) RETURN c.id AS id, c.summary AS summary",
+    "RelatedTo": "MATCH (a:Entity)-[r:RelatedTo]->(b:Entity) RETURN a.id AS `from`, b.id AS `to`, r.type AS type, r.weight AS weight, r.confidence AS confidence, r.valid_from AS valid_from, r.valid_to AS valid_to",
+    "MemberOf": "MATCH (e:Entity)-[:MemberOf]->(c:Community) RETURN e.id AS `from`, c.id AS `to`",
+}
+# Columns that identify an edge, so re-importing an export does not duplicate it.
+_EDGE_KEYS = {"RelatedTo": ("from", "to", "type", "valid_from"), "MemberOf": ("from", "to")}
+
+def _path_literal(path: Path) -> str:
+    """Cypher string literal for a file path (COPY takes no parameters)."""
+    return "'" + str(path).replace("\\", "\\\\").replace("'", "\\'") + "'"
+
 class KuzuGraphStore:
     def __init__(self, db_path: Path, buffer_pool_gb: int = 4):
         self.log = logging.getLogger("SynthMemory")
+        self.db_path = db_path
         self._closed = False
         if kuzu is None:
             raise ImportError("Kùzu is not available.")
@@ -82,26 +111,94 @@ class KuzuGraphStore:
 
     def get_community_id(self, entity_id: str) -> Optional[int]:
         with self.lock:
-            query = "MATCH (e:Entity {id: $id})-[:MemberOf]->(c:Community) RETURN c.id LIMIT 1"
-            try:
-                res = self.conn.execute(query, {"id": str(entity_id)})
-                if res is None or not res.has_next(): return None
-                row = res.get_next()
-                return row[0] if row else None
-            except Exception: return None
+            return self._community_id(entity_id)
 
-    def traverse_bounded(self, start_id: str, depth: int = 2, limit: int = 50) -> List[Dict[str, Any]]:
+    def _community_id(self, entity_id: str) -> Optional[int]:
+        query = "MATCH (e:Entity {id: $id})-[:MemberOf]->(c:Community) RETURN c.id LIMIT 1"
+        try:
+            res = self.conn.execute(query, {"id": str(entity_id)})
+            if res is None or not res.has_next(): return None
+            row = res.get_next()
+            return row[0] if row else None
+        except Exception: return None
+
+    def traverse_bounded(self, start_id: str, depth: int = 2, limit: int = 50, as_of: Optional[str] = None, temporal: bool = True) -> List[Dict[str, Any]]:
+        """
+        Bounded multi-hop neighbourhood of an entity.
+        With `temporal`, RelatedTo edges are only followed while valid at `as_of` (default:
+        now); expired ones are pruned inside the recursive match. Other edges (MemberOf)
+        carry no validity interval and are always followed.
+        """
         with self.lock:
-            cid = self.get_community_id(start_id)
+            cid = self._community_id(start_id)
             where = f"WHERE (neighbor)-[:MemberOf]->(:Community {{id: {cid}}})" if cid is not None else ""
-            query = f"MATCH (start:Entity {{id: $id}})-[r*1..{int(depth)}]-(neighbor:Entity) {where} RETURN neighbor.id AS id, neighbor.name AS name, neighbor.type AS type LIMIT {int(limit)}"
+            params = {"id": str(start_id)}
+            if temporal:
+                params["at"] = as_of or datetime.now().isoformat()
+                rel = f"[r*1..{int(depth)} (e, n | WHERE label(e) <> 'RelatedTo' OR (e.valid_from <= timestamp($at) AND (e.valid_to IS NULL OR e.valid_to > timestamp($at))))]"
+            else:
+                rel = f"[r*1..{int(depth)}]"
+            query = f"MATCH (start:Entity {{id: $id}})-{rel}-(neighbor:Entity) {where} RETURN neighbor.id AS id, neighbor.name AS name, neighbor.type AS type LIMIT {int(limit)}"
             try:
-                res = self.conn.execute(query, {"id": str(start_id)})
+                res = self.conn.execute(query, params)
                 if res is None: return []
                 df = res.get_as_df()
                 return df.to_dict("records") if df is not None else []
             except Exception: return []
 
+    def export_csv(self, out_dir: Path) -> Dict[str, str]:
+        """Streams every table to CSV with Kùzu's COPY TO. Returns table -> file name."""
+        files = {}
+        with self.lock:
+            for table, query in _EXPORT_QUERIES.items():
+                name = f"{table.lower()}.csv"
+                self.conn.execute(f"COPY ({query}) TO {_path_literal(out_dir / name)} (header=true)")
+                files[table] = name
+        return files
+
+    def import_csv(self, in_dir: Path, files: Dict[str, str]) -> None:
+        """
+        Bulk-loads an export with COPY FROM. Nodes whose primary key already exists are
+        skipped, so importing into a populated graph keeps the existing entities. Edges
+        already in the graph (same _EDGE_KEYS columns) are filtered out before the COPY.
+        """
+        with self.lock, tempfile.TemporaryDirectory() as tmp:
+            for table in ("Entity", "Community", "RelatedTo", "MemberOf"):
+                if table not in files: continue
+                source = in_dir / files[table]
+                if table in _EDGE_KEYS:
+                    source = self._new_edges(table, source, Path(tmp))
+                    if source is None: continue
+                options = "header=true, ignore_errors=true" if table in ("Entity", "Community") else "header=true"
+                self.conn.execute(f"COPY {table} FROM {_path_literal(source)} ({options})")
+
+    def _new_edges(self, table: str, source: Path, tmp: Path) -> Optional[Path]:
+        """Copy of `source` without the edges the graph already has; None when nothing is new."""
+        existing = tmp / f"{table.lower()}.existing.csv"
+        # Exported through COPY TO as well, so values are formatted exactly like the export's.
+        self.conn.execute(f"COPY ({_EXPORT_QUERIES[table]}) TO {_path_literal(existing)} (header=true)")
+        key = lambda row: tuple(row[c] for c in _EDGE_KEYS[table])
+        with open(existing, newline='') as f:
+            seen = {key(row) for row in csv.DictReader(f)}
+        fresh, kept = tmp / f"{table.lower()}.csv", 0
+        with open(source, newline='') as src, open(fresh, 'w', newline='') as out:
+            reader = csv.DictReader(src)
+            writer = csv.DictWriter(out, fieldnames=reader.fieldnames)
+            writer.writeheader()
+            for row in reader:
+                if key(row) in seen: continue
+                seen.add(key(row))
+                writer.writerow(row)
+                kept += 1
+        return fresh if kept else None
+
+    @contextmanager
+    def frozen(self):
+        """Holds writers off with the WAL folded into the database file, so it can be copied consistently."""
+        with self.lock:
+            self.conn.execute("CHECKPOINT")
+            yield
+
     def close(self):
         with self.lock:
             if self._closed: return
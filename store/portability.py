@@ -0,0 +1,146 @@
+import json
+import base64
+import logging
+import numpy as np
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+EXPORT_VERSION = 1
+
+def _encode_meta(meta: Dict) -> Dict:
+    # Sealed text is raw bytes; JSON carries it as base64.
+    return {k: {"$b64": base64.b64encode(v).decode()} if isinstance(v, bytes) else v for k, v in meta.items()}
+
+def _decode_meta(meta: Dict) -> Dict:
+    return {k: base64.b64decode(v["$b64"]) if isinstance(v, dict) and "$b64" in v else v for k, v in meta.items()}
+
+class MemoryExporter:
+    """
+    Streaming export of the memory stores into a portable directory:
+    vectors as chunked `.npy` parts, metadata as JSONL in the same row order, the graph
+    as CSV via Kùzu COPY TO and a manifest written last. At most `chunk_rows` vectors are
+    held in memory. Rows stay sealed unless `plaintext` is set; sealed exports carry the
+    wrapped data keys and can only be opened by an installation with the same master key.
+    """
+    def __init__(self, vs, gs=None, keyring=None, chunk_rows: int = 4096, plaintext: bool = False):
+        self.vs = vs
+        self.gs = gs
+        self.keyring = keyring
+        self.chunk_rows = chunk_rows
+        self.plaintext = plaintext
+        self.log = logging.getLogger("SynthMemory")
+
+    def _readable(self, meta: Dict) -> bool:
+        if "evicted" in meta: return False
+        return "text_enc" not in meta or (self.keyring is not None and self.keyring.is_live(meta["kid"]))
+
+    def _open(self, metas: List[Dict]) -> List[Optional[Dict]]:
+        sealed = [i for i, m in enumerate(metas) if "text_enc" in m]
+        texts = self.keyring.decrypt_many([(metas[i]["kid"], metas[i]["text_enc"]) for i in sealed]) if sealed else []
+        out = [dict(m) for m in metas]
+        for i, text in zip(sealed, texts):
+            if text is None:
+                out[i] = None
+                continue
+            out[i] = {k: v for k, v in out[i].items() if k not in ("kid", "text_enc")}
+            out[i]["text"] = text
+        for m in out:
+            # Content hashes are keyed by the source keyring and mean nothing elsewhere.
+            if m is not None: m.pop("hash", None)
+        return out
+
+    def run(self, out_dir: Path) -> Dict[str, Any]:
+        manifest_file = out_dir / "manifest.json"
+        if manifest_file.exists():
+            raise FileExistsError(f"{out_dir} already contains an export.")
+        (out_dir / "vectors").mkdir(parents=True, exist_ok=True)
+        parts, rows, skipped = [], 0, 0
+        with open(out_dir / "metadata.jsonl", 'w') as meta_f:
+            for _, vectors, metas in self.vs.iter_rows(self.chunk_rows):
+                opened = self._open(metas) if self.plaintext else metas
+                keep = [j for j, m in enumerate(metas) if self._readable(m) and opened[j] is not None]
+                skipped += len(metas) - len(keep)
+                if not keep: continue
+                name = f"vectors/part-{len(parts):05d}.npy"
+                np.save(out_dir / name, np.ascontiguousarray(vectors[keep], dtype='float32'))
+                for j in keep:
+                    meta_f.write(json.dumps(_encode_meta(opened[j])) + "\n")
+                parts.append({"file": name, "rows": len(keep)})
+                rows += len(keep)
+
+        graph = {}
+        if self.gs is not None:
+            (out_dir / "graph").mkdir(exist_ok=True)
+            graph = self.gs.export_csv(out_dir / "graph")
+        sealed = self.keyring is not None and not self.plaintext
+        if sealed:
+            with open(out_dir / "keys.json", 'w') as f:
+                json.dump(self.keyring.export_keys(), f)
+
+        manifest = {
+            "version": EXPORT_VERSION, "created": datetime.now().isoformat(),
+            "dimension": self.vs.get_dimension(), "rows": rows, "skipped": skipped,
+            "parts": parts, "graph": graph, "sealed": sealed
+        }
+        # Written last: a directory without a manifest is an interrupted export.
+        with open(manifest_file, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        self.log.info(f"[SynthMemory: Export] Exported {rows} memories ({skipped} shredded/evicted skipped) to {out_dir}.")
+        return manifest
+
+class MemoryImporter:
+    """
+    Bulk-loads a MemoryExporter directory: vector parts are memory-mapped and added in
+    batches of `batch_rows` without persisting in between, then flushed once; the graph
+    goes through Kùzu COPY FROM. Imported rows are appended under new row ids; rows whose
+    memory id (or content hash) the store already holds are skipped, so re-importing an
+    export adds nothing twice. Tombstoned ids count as held, so shredded, deleted and
+    archived memories are not brought back. Sealed exports are refused unless every data
+    key unwraps under the local master key.
+    """
+    def __init__(self, vs, gs=None, keyring=None, batch_rows: int = 4096):
+        self.vs = vs
+        self.gs = gs
+        self.keyring = keyring
+        self.batch_rows = batch_rows
+        self.log = logging.getLogger("SynthMemory")
+
+    def _is_duplicate(self, meta: Dict, known: set) -> bool:
+        if meta.get("id") is not None:
+            if meta["id"] in known: return True
+            known.add(meta["id"])
+            return False
+        return "hash" in meta and self.vs.find_exact(meta["hash"], meta.get("mode", "default")) is not None
+
+    def run(self, in_dir: Path) -> Dict[str, Any]:
+        with open(in_dir / "manifest.json") as f:
+            manifest = json.load(f)
+        if manifest.get("version") != EXPORT_VERSION:
+            raise ValueError(f"Unsupported export version {manifest.get('version')}.")
+        if manifest["dimension"] != self.vs.get_dimension():
+            raise ValueError(f"Export has dimension {manifest['dimension']}, store expects {self.vs.get_dimension()}. Import with the matching embedding model, then re-index.")
+        if manifest.get("sealed"):
+            if self.keyring is None:
+                raise ValueError("Export is sealed; enable security.encrypt_at_rest to import it.")
+            with open(in_dir / "keys.json") as f:
+                self.keyring.import_keys(json.load(f))
+
+        known = set(self.vs.memory_ids())
+        rows, duplicates = 0, 0
+        with open(in_dir / "metadata.jsonl") as meta_f:
+            for part in manifest["parts"]:
+                vectors = np.load(in_dir / part["file"], mmap_mode='r')
+                for start in range(0, part["rows"], self.batch_rows):
+                    stop = min(start + self.batch_rows, part["rows"])
+                    metas = [_decode_meta(json.loads(next(meta_f))) for _ in range(stop - start)]
+                    keep = [j for j, m in enumerate(metas) if not self._is_duplicate(m, known)]
+                    duplicates += len(metas) - len(keep)
+                    if keep: self.vs.add(np.asarray(vectors[start:stop], dtype='float32')[keep], [metas[j] for j in keep], persist=False)
+                    rows += len(keep)
+        self.vs.flush()
+
+        if self.gs is not None and manifest.get("graph"):
+            self.gs.import_csv(in_dir / "graph", manifest["graph"])
+        self.log.info(f"[SynthMemory: Import] Imported {rows} memories ({duplicates} already present) from {in_dir}.")
+        return {"rows": rows, "duplicates": duplicates, "graph_tables": len(manifest.get("graph", {}))}
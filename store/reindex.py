@@ -0,0 +1,179 @@
+import os
+import json
+import time
+import asyncio
+import shutil
+import logging
+import numpy as np
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Any, List, Optional, Tuple
+from .vector_store import _Segment
+
+try:
+    import faiss
+except ImportError:
+    faiss = None
+
+def read_progress(checkpoint_file: Path) -> Optional[Dict[str, Any]]:
+    """Checkpoint contents plus derived progress/throughput, or None when nothing is scheduled."""
+    if not checkpoint_file.exists(): return None
+    with open(checkpoint_file) as f:
+        state = json.load(f)
+    target = (state.get("target_rows") or 0) + state.get("cold_rows", 0)
+    done = state.get("next_row", 0) + state.get("cold_next_row", 0)
+    elapsed = state.get("elapsed_s", 0.0)
+    rate = state.get("embedded", 0) / elapsed if elapsed else 0.0
+    state["done_rows"], state["total_rows"] = done, target
+    state["percent"] = 100.0 * done / target if target else 0.0
+    state["rows_per_s"] = rate
+    state["eta_s"] = (target - done) / rate if rate else None
+    return state
+
+class ReindexPipeline:
+    """
+    Resumable re-embedding of every stored memory into a fresh index.
+    Rows are streamed from the metadata in chunks, embedded in batches of `batch_size`
+    with at most `concurrency` requests in flight, and written to staging segments next to
+    the live ones. A JSON checkpoint after every chunk lets a crashed run resume where it
+    stopped; the live index keeps serving until the finished segments are swapped in.
+    With a `cold` archive, its rows are re-embedded next (checkpointed the same way, staged
+    as .npy chunks) and the archive is rebuilt once the hot segments have been adopted.
+    """
+    def __init__(self, store, embed_fn: Callable, batch_size: int = 64, concurrency: int = 4, chunk_rows: int = 1024, cold=None):
+        self.store = store
+        self.cold = cold
+        self.embed_fn = embed_fn
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.chunk_rows = chunk_rows
+        self.checkpoint_file = store.reindex_file
+        self.stage_dir = store.index_dir / "segments.reindex"
+        self.cold_stage_dir = self.stage_dir / "cold"
+        self.log = logging.getLogger("SynthMemory")
+
+    @staticmethod
+    def pending(store) -> bool:
+        return store.reindex_file.exists()
+
+    def _write_checkpoint(self, state: Dict[str, Any]):
+        state["updated"] = datetime.now().isoformat()
+        tmp = self.checkpoint_file.with_suffix(".tmp")
+        with open(tmp, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp, self.checkpoint_file)
+
+    def _load_stage(self, next_row: int, target: int) -> Dict[str, _Segment]:
+        staged = {}
+        if not self.stage_dir.exists(): return staged
+        epochs = self.store.epochs()
+        for path in sorted(self.stage_dir.glob("*.index")):
+            seg = _Segment(path.stem, faiss.read_index(str(path)))
+            # Segment files can run ahead of the checkpoint after a crash; drop the overlap.
+            seg = self.store._without(seg, np.arange(next_row, target, dtype='int64'))
+            seg.widen(epochs[seg.ids()])
+            staged[seg.key] = seg
+        return staged
+
+    def _save_stage(self, staged: Dict[str, _Segment], keys: set):
+        self.stage_dir.mkdir(parents=True, exist_ok=True)
+        for key in keys:
+            path = self.stage_dir / f"{key}.index"
+            tmp = path.with_suffix(".tmp")
+            faiss.write_index(staged[key].index, str(tmp))
+            os.replace(tmp, path)
+
+    def _save_cold_chunk(self, start: int, ids: np.ndarray, vectors: np.ndarray):
+        self.cold_stage_dir.mkdir(parents=True, exist_ok=True)
+        path = self.cold_stage_dir / f"{start:012d}.npz"
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, 'wb') as f:
+            np.savez(f, ids=ids, vectors=vectors)
+        os.replace(tmp, path)
+
+    def _cold_chunks(self, next_row: int):
+        # Chunks at or past the checkpoint were written by a run that crashed before recording them.
+        for path in sorted(self.cold_stage_dir.glob("*.npz")):
+            if int(path.stem) >= next_row: continue
+            with np.load(path) as chunk:
+                yield chunk["ids"], chunk["vectors"]
+
+    async def _embed_rows(self, rows: List[Tuple[int, str]]) -> Tuple[np.ndarray, np.ndarray]:
+        vectors = await self._embed([text for _, text in rows])
+        if vectors.shape[1] != self.store.dimension:
+            raise ValueError(f"Embedding provider returned dimension {vectors.shape[1]}, expected {self.store.dimension}.")
+        return np.array([i for i, _ in rows], dtype='int64'), vectors
+
+    async def _embed(self, texts: List[str]) -> np.ndarray:
+        gate = asyncio.Semaphore(self.concurrency)
+
+        async def one(text: str):
+            async with gate:
+                return await self.embed_fn(text)
+
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            batch = texts[start:start + self.batch_size]
+            vectors.extend(await asyncio.gather(*(one(t) for t in batch)))
+        return np.asarray(vectors, dtype='float32').reshape(len(texts), -1)
+
+    async def run(self) -> Dict[str, Any]:
+        with open(self.checkpoint_file) as f:
+            state = json.load(f)
+        if not state.get("target_rows"): state["target_rows"] = self.store._snap.n
+        state.setdefault("next_row", 0)
+        state.setdefault("embedded", 0)
+        state.setdefault("skipped", 0)
+        state.setdefault("elapsed_s", 0.0)
+        state.setdefault("started", datetime.now().isoformat())
+        state.setdefault("cold_rows", self.cold.reindex_rows if self.cold is not None else 0)
+        state.setdefault("cold_next_row", 0)
+        if state.get("dimension") not in (None, self.store.dimension):
+            self.log.warning(f"[SynthMemory: Reindex] Embedding dimension changed again ({state['dimension']} -> {self.store.dimension}); restarting.")
+            shutil.rmtree(self.stage_dir, ignore_errors=True)
+            state.update(next_row=0, cold_next_row=0, embedded=0, skipped=0, elapsed_s=0.0)
+        state["dimension"] = self.store.dimension
+        state["state"] = "running"
+        target = state["target_rows"]
+        staged = self._load_stage(state["next_row"], target)
+        self.log.info(f"[SynthMemory: Reindex] Re-embedding rows {state['next_row']}..{target} at dimension {self.store.dimension}.")
+
+        while state["next_row"] < target:
+            started = time.perf_counter()
+            stop = min(state["next_row"] + self.chunk_rows, target)
+            rows: List[Tuple[int, str]] = self.store.source_rows(state["next_row"], stop)
+            if rows:
+                ids, vectors = await self._embed_rows(rows)
+                touched = self.store._insert(staged, vectors, ids, self.store.epochs()[ids], cow=False)
+                self._save_stage(staged, touched)
+            state["embedded"] += len(rows)
+            state["skipped"] += (stop - state["next_row"]) - len(rows)
+            state["next_row"] = stop
+            state["elapsed_s"] += time.perf_counter() - started
+            self._write_checkpoint(state)
+
+        if self.cold is not None and self.cold.rebuilt != state["started"]:
+            while state["cold_next_row"] < state["cold_rows"]:
+                started = time.perf_counter()
+                start = state["cold_next_row"]
+                stop = min(start + self.chunk_rows, state["cold_rows"])
+                rows = self.cold.source_rows(start, stop)
+                if rows: self._save_cold_chunk(start, *await self._embed_rows(rows))
+                state["embedded"] += len(rows)
+                state["skipped"] += (stop - start) - len(rows)
+                state["cold_next_row"] = stop
+                state["elapsed_s"] += time.perf_counter() - started
+                self._write_checkpoint(state)
+
+        state["state"] = "swapping"
+        self._write_checkpoint(state)
+        self.store.adopt_segments(staged, target)
+        # After the hot swap: until the archive is replaced, its row ids still name the source rows.
+        if self.cold is not None and state["cold_rows"] and self.cold.rebuilt != state["started"]:
+            self.cold.rebuild(self._cold_chunks(state["cold_next_row"]), token=state["started"])
+        shutil.rmtree(self.stage_dir, ignore_errors=True)
+        self.checkpoint_file.unlink()
+        rate = state["embedded"] / state["elapsed_s"] if state["elapsed_s"] else 0.0
+        self.log.info(f"[SynthMemory: Reindex] Done: {state['embedded']} rows re-embedded, {state['skipped']} skipped, {rate:.1f} rows/s.")
+        state["state"] = "done"
+        return state
@@ -0,0 +1,183 @@
+import re
+import time
+import threading
+import logging
+import numpy as np
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, Tuple
+from .vector_store import to_epoch
+
+class TieredVectorStore:
+    """
+    Hot/cold vector store with the same surface as FAISSVectorStore.
+    Writes, dedup and reinforcement go to the full-precision hot tier. Recall searches the
+    hot tier first and only consults the compressed cold tier when the remaining latency
+    budget covers its (moving-average) search cost.
+    """
+    def __init__(self, hot, cold, cfg):
+        self.hot = hot
+        self.cold = cold
+        self.cfg = cfg
+        self.log = logging.getLogger("SynthMemory")
+        self._cold_ms = 0.0
+        self._move_lock = threading.Lock()
+
+    # --- Pass-through surface -------------------------------------------------
+    def add(self, vectors: np.ndarray, metas: List[Dict], persist: bool = True):
+        self.hot.add(vectors, metas, persist=persist)
+
+    def flush(self):
+        self.hot.flush()
+
+    def iter_rows(self, chunk_rows: int = 4096):
+        # Cold rows come back PQ-decoded, i.e. approximations of the original vectors.
+        yield from self.hot.iter_rows(chunk_rows)
+        if self.cold is not None: yield from self.cold.iter_rows(chunk_rows)
+
+    def memory_ids(self):
+        yield from self.hot.memory_ids()
+        if self.cold is not None: yield from self.cold.memory_ids()
+
+    def shred_namespace(self, namespace: str) -> int:
+        # Both tiers share the keyring: destroying the keys shreds archived rows too, and the
+        # archive leaves rows under dead keys out of its searches.
+        return self.hot.shred_namespace(namespace)
+
+    def fingerprint(self, text: str, namespace: str) -> str:
+        return self.hot.fingerprint(text, namespace)
+
+    def find_exact(self, content_hash: str, namespace: str) -> Optional[int]:
+        return self.hot.find_exact(content_hash, namespace)
+
+    def find_near(self, vector: np.ndarray, namespace: str, k: int = 4) -> List[Tuple[int, float]]:
+        return self.hot.find_near(vector, namespace, k=k)
+
+    def reinforce(self, idx: int, ts: str, thresholds: Optional[Dict[str, int]] = None) -> Optional[Dict]:
+        return self.hot.reinforce(idx, ts, thresholds)
+
+    def get_dimension(self):
+        return self.hot.get_dimension()
+
+    # --- Recall -----------------------------------------------------------------
+    def search(self, query_vector: np.ndarray, k: int = 5, since=None, as_of=None) -> List[Dict[str, Any]]:
+        since, as_of = to_epoch(since), to_epoch(as_of)
+        start = time.perf_counter()
+        hits = self.hot.search(query_vector, k=k, since=since, as_of=as_of)
+        # Recency-bounded queries usually rule out the whole archive without touching it.
+        if self.cold is None or not self.cold.overlaps(since, as_of): return hits
+
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+        budget_ms = self.cfg.retrieval.cold_tier_budget_ms
+        if elapsed_ms + self._cold_ms > budget_ms:
+            self.log.debug(f"[SynthMemory: TieredStore] Skipping cold tier ({elapsed_ms:.1f}ms + ~{self._cold_ms:.1f}ms > {budget_ms}ms).")
+            return hits
+
+        cold_start = time.perf_counter()
+        cold_hits = self.cold.search(query_vector, k=k, since=since, as_of=as_of)
+        cold_ms = (time.perf_counter() - cold_start) * 1000.0
+        self._cold_ms = cold_ms if self._cold_ms == 0.0 else 0.8 * self._cold_ms + 0.2 * cold_ms
+        return self._merge(hits, cold_hits, k)
+
+    @staticmethod
+    def _merge(hot_hits: List[Dict], cold_hits: List[Dict], k: int) -> List[Dict[str, Any]]:
+        # A row can briefly exist in both tiers while the mover runs; keep the hot copy.
+        seen = {h["metadata"].get("id") for h in hot_hits}
+        merged = hot_hits + [h for h in cold_hits if h["metadata"].get("id") not in seen]
+        merged.sort(key=lambda h: h["score"])
+        for rank, hit in enumerate(merged[:k]):
+            hit["rank"] = rank + 1
+        return merged[:k]
+
+    # --- Lifecycle ----------------------------------------------------------------
+    def _summarize(self, metas: List[Dict]) -> List[Dict]:
+        """Extractive summary (leading sentences, capped) for the Summarize policy."""
+        limit = self.cfg.lifecycle.summary_max_chars
+        keyring = getattr(self.hot, "keyring", None)
+        sealed = [i for i, m in enumerate(metas) if "text_enc" in m]
+        texts = keyring.decrypt_many([(metas[i]["kid"], metas[i]["text_enc"]) for i in sealed]) if sealed and keyring else []
+        plain = {i: t for i, t in zip(sealed, texts) if t is not None}
+        out = []
+        for i, meta in enumerate(metas):
+            text = plain.get(i, meta.get("text"))
+            if text is None or len(text) <= limit:
+                # Short or already-shredded rows are archived as they are.
+                out.append(meta)
+                continue
+            head = " ".join(re.split(r"(?<=[.!?])\s+", text)[:2])
+            summary = {k: v for k, v in meta.items() if k not in ("kid", "text_enc")}
+            summary.update(text=head[:limit].rstrip() + "…", summarized=True)
+            out.append(self.hot._seal(summary))
+        return out
+
+    def apply_policy(self) -> Dict[str, int]:
+        """Moves aged, unreinforced rows out of the hot tier per LifecycleConfig.compression_policy."""
+        lc = self.cfg.lifecycle
+        policy = lc.compression_policy
+        cutoff = (datetime.now() - timedelta(days=lc.hot_max_age_days)).isoformat()
+        with self._move_lock:
+            # A row moved mid re-embedding would reach the archive with its old-model vector.
+            if self.hot.reindex_file.exists(): return {"moved": 0, "deleted": 0}
+            rows = self.hot.eviction_candidates(cutoff, lc.hot_max_rows)
+            if not rows: return {"moved": 0, "deleted": 0}
+            if policy == "Delete":
+                deleted = self.hot.move_rows(rows, None, reason="deleted")
+                self.log.info(f"[SynthMemory: TieredStore] Deleted {len(deleted)} aged memories from the hot tier.")
+                return {"moved": 0, "deleted": len(deleted)}
+
+            if self.cold is None or not self.cold.can_accept(len(rows)):
+                self.log.debug(f"[SynthMemory: TieredStore] {len(rows)} rows eligible but cold tier cannot accept them yet.")
+                return {"moved": 0, "deleted": 0}
+
+            def archive(rows, vectors, metas):
+                if policy == "Summarize": metas = self._summarize(metas)
+                self.cold.append(vectors, metas, compact=False)
+
+            # Rows are re-checked, archived and dropped under the hot write lock; compaction waits until after.
+            moved = self.hot.move_rows(rows, archive, reason="archived")
+            self.cold.compact()
+            self.log.info(f"[SynthMemory: TieredStore] Moved {len(moved)} memories to the cold tier ({policy}).")
+            return {"moved": len(moved), "deleted": 0}
+
+    def close(self):
+        if self.cold is not None: self.cold.close()
+        self.hot.close()
+
+class TierMover:
+    """Background thread that periodically applies the lifecycle policy to a TieredVectorStore."""
+    def __init__(self, store: TieredVectorStore, interval_s: int):
+        self.store = store
+        self.interval_s = interval_s
+        self.log = logging.getLogger("SynthMemory")
+        self._stop = threading.Event()
+        # Set by reconfigure and stop, so a changed interval applies without waiting out the old one.
+        self._wake = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive(): return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def reconfigure(self, interval_s: int):
+        self.interval_s = interval_s
+        self._wake.set()
+
+    def _loop(self):
+        last = time.monotonic()
+        while not self._stop.is_set():
+            # Recomputed on every wake-up, against the time of the last run.
+            remaining = self.interval_s - (time.monotonic() - last)
+            if remaining > 0:
+                self._wake.wait(remaining)
+                self._wake.clear()
+                continue
+            last = time.monotonic()
+            try:
+                self.store.apply_policy()
+            except Exception as e:
+                self.log.error(f"[SynthMemory: TierMover] {e}")
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
@@ -1,17 +1,75 @@
+import os
+import math
+import json
 from datetime import datetime
 import numpy as np
 import pickle
 import threading
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 import logging
 import shutil
+import hashlib
 
 try:
     import faiss
 except ImportError:
     faiss = None
 
+HNSW_M = 32
+IVF_PQ_NPROBE = 8
+# Reinforcement only touches metadata; bursts of it are written once after this delay.
+PERSIST_DELAY_S = 2.0
+# Smallest segment worth training an IVF-PQ on; smaller ones stay flat.
+IVF_PQ_MIN_ROWS = 1024
+# Writes to a published segment go to small delta segments, merged once this many pile up.
+DELTA_MAX_SEGMENTS = 8
+# Metadata is persisted in files of this many rows; a write rewrites only the files it touched.
+META_CHUNK_ROWS = 4096
+
+def open_sealed_hits(keyring, hits: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Batched decryption of just the returned rows; shredded rows are dropped."""
+    sealed = [i for i, h in enumerate(hits) if "text_enc" in h["metadata"]]
+    if not sealed: return hits
+    if not keyring:
+        return [h for h in hits if "text_enc" not in h["metadata"]]
+    texts = keyring.decrypt_many([(hits[i]["metadata"]["kid"], hits[i]["metadata"]["text_enc"]) for i in sealed])
+    dead = set()
+    for i, text in zip(sealed, texts):
+        if text is None:
+            dead.add(i)
+            continue
+        meta = {k: v for k, v in hits[i]["metadata"].items() if k not in ("kid", "text_enc")}
+        meta["text"] = text
+        hits[i]["metadata"] = meta
+    return [h for i, h in enumerate(hits) if i not in dead]
+
+def plaintext_rows(keyring, rows: List[Tuple[int, Dict]]) -> List[Tuple[int, str]]:
+    """(row, text) of the given (row, metadata) pairs, sealed ones decrypted in one batch; shredded rows are left out."""
+    out = [(i, m["text"]) for i, m in rows if "text" in m]
+    sealed = [(i, m) for i, m in rows if "text_enc" in m]
+    if sealed and keyring:
+        texts = keyring.decrypt_many([(m["kid"], m["text_enc"]) for _, m in sealed])
+        out.extend((i, t) for (i, _), t in zip(sealed, texts) if t is not None)
+    return sorted(out)
+
+def _pq_subquantizers(dimension: int, code_bytes: int) -> int:
+    """Largest divisor of `dimension` that fits the per-vector code budget."""
+    for m in range(min(code_bytes, dimension), 0, -1):
+        if dimension % m == 0: return m
+    return 1
+
+def train_ivfpq(vectors: np.ndarray, dimension: int, code_bytes: int = 64):
+    """IVF-PQ trained on `vectors`: nlist ~ sqrt(n), PQ bits reduced until every centroid has enough points."""
+    n = vectors.shape[0]
+    nlist = max(1, min(1024, int(math.sqrt(n))))
+    # Keep at least 39 training points per PQ centroid to avoid degenerate codebooks.
+    nbits = next((b for b in (8, 6, 5, 4) if 39 * (1 << b) <= n), 4)
+    m = _pq_subquantizers(dimension, code_bytes)
+    index = faiss.IndexIVFPQ(faiss.IndexFlatL2(dimension), dimension, nlist, m, nbits)
+    index.train(vectors)
+    return index
+
 class NoOpVectorStore:
     """No-op vector store that gracefully degrades when FAISS is unavailable."""
     def __init__(self, index_dir: Path, dimension: int):
@@ -23,14 +81,38 @@ class NoOpVectorStore:
         self.lock = threading.Lock()
         self.log.warning("[SynthMemory: VectorStore] FAISS not available. Running in degraded mode (no vector memory).")
 
-    def add(self, vectors: np.ndarray, metas: List[Dict]):
+    def add(self, vectors: np.ndarray, metas: List[Dict], persist: bool = True):
         assert vectors.shape[1] == self.dimension, "Embedding vector shape mismatch"
         pass
 
-    def search(self, query_vector: np.ndarray, k: int = 5) -> List[Dict[str, Any]]:
+    def flush(self):
+        pass
+
+    def iter_rows(self, chunk_rows: int = 4096):
+        return iter(())
+
+    def memory_ids(self):
+        return iter(())
+
+    def search(self, query_vector: np.ndarray, k: int = 5, since=None, as_of=None) -> List[Dict[str, Any]]:
         assert query_vector.shape[0] == self.dimension, "Query vector shape mismatch"
         return []
 
+    def shred_namespace(self, namespace: str) -> int:
+        return 0
+
+    def fingerprint(self, text: str, namespace: str) -> str:
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    def find_exact(self, content_hash: str, namespace: str) -> Optional[int]:
+        return None
+
+    def find_near(self, vector: np.ndarray, namespace: str, k: int = 4) -> List[Tuple[int, float]]:
+        return []
+
+    def reinforce(self, idx: int, ts: str, thresholds: Optional[Dict[str, int]] = None) -> Optional[Dict]:
+        return None
+
     def get_dimension(self):
         return self.dimension
 
@@ -39,12 +121,80 @@ class NoOpVectorStore:
             if not self._closed:
                 self._closed = True
 
+def index_kind(index) -> str:
+    """Flat, HNSW or IVF_PQ for an IDMap'd segment index (VectorIndexType values)."""
+    inner = faiss.downcast_index(index.index)
+    if isinstance(inner, faiss.IndexHNSW): return "HNSW"
+    if isinstance(inner, faiss.IndexIVF): return "IVF_PQ"
+    return "Flat"
+
+class _Segment:
+    """
+    One time window of the hot index: an IDMap'd index (flat, HNSW or IVF-PQ) over global
+    row ids. Segments are immutable once published in a snapshot; writers mutate a clone.
+    """
+    def __init__(self, key: str, index, min_t: float = float("inf"), max_t: float = float("-inf")):
+        self.key = key
+        self.index = index
+        self.min_t = min_t
+        self.max_t = max_t
+        self.kind = index_kind(index)
+
+    def search_params(self, sel):
+        if self.kind == "IVF_PQ":
+            return faiss.SearchParametersIVF(sel=sel, nprobe=faiss.downcast_index(self.index.index).nprobe)
+        return faiss.SearchParameters(sel=sel)
+
+    def vectors(self) -> np.ndarray:
+        return self.index.index.reconstruct_n(0, self.index.ntotal)
+
+    def ids(self) -> np.ndarray:
+        return faiss.vector_to_array(self.index.id_map)
+
+    def cloned(self) -> "_Segment":
+        return _Segment(self.key, faiss.clone_index(self.index), self.min_t, self.max_t)
+
+    def widen(self, epochs: np.ndarray):
+        if epochs.size == 0: return
+        self.min_t = min(self.min_t, float(epochs.min()))
+        self.max_t = max(self.max_t, float(epochs.max()))
+
+class _Snapshot:
+    """What a reader sees: the published segments and the first `n` rows of metadata/epochs/modes."""
+    __slots__ = ("segments", "n", "epochs", "modes")
+
+    def __init__(self, segments: Dict[str, _Segment], n: int, epochs: np.ndarray, modes: np.ndarray):
+        self.segments = segments
+        self.n = n
+        self.epochs = epochs[:n]
+        self.modes = modes[:n]
+
+def to_epoch(value) -> Optional[float]:
+    """Accepts None, epoch seconds, datetime or ISO-8601 strings."""
+    if value is None: return None
+    if isinstance(value, (int, float)): return float(value)
+    if isinstance(value, datetime): return value.timestamp()
+    return datetime.fromisoformat(str(value)).timestamp()
+
 class FAISSVectorStore: 
     """
     High-performance vector store utilizing FAISS.
     Optimized for Arch Linux by using IndexFlatL2 with AVX-512 paths for smaller namespaces.
+    Rows are partitioned into time-window segments (day/week/month, rolled over every
+    `max_segment_rows`) so "since"/"as-of" queries skip every segment outside the window.
+    Each segment carries its own index type; `migrate_index` converts them one at a time
+    when `index_type` changes, and IVF-PQ is only trained on segments of IVF_PQ_MIN_ROWS+.
+
+    Reads are lock-free against an immutable snapshot. Writers serialize on `lock`, never
+    modify a published segment (new rows land in small delta segments that are merged in
+    batches), publish a new snapshot with a single attribute swap and persist afterwards,
+    so recall never waits on ingest or disk I/O. Metadata is an append-only list whose row
+    dicts are replaced, never mutated, once published; it is stored in META_CHUNK_ROWS files.
+
+    When a keyring is supplied, memory text is sealed per namespace before it reaches
+    the pickled metadata and only the k rows a search returns are ever decrypted.
     """
-    def __init__(self, index_dir: Path, dimension: int):
+    def __init__(self, index_dir: Path, dimension: int, keyring=None, segment_window: str = "week", max_segment_rows: int = 4096, index_type: str = "Flat"):
         self.log = logging.getLogger("SynthMemory")
         self._closed = False
         if faiss is None:
@@ -52,58 +202,624 @@ class FAISSVectorStore:
         self.index_dir = index_dir
         self.idx_file = index_dir / "vector.index"
         self.meta_file = index_dir / "vector.meta"
+        self.meta_dir = index_dir / "meta"
+        self.seg_dir = index_dir / "segments"
         self.dimension = dimension
+        self.segment_window = segment_window
+        self.max_segment_rows = max_segment_rows
+        self.index_type = getattr(index_type, "value", index_type)
+        self._migrating = False
+        self._migration_requested = False
         self.metadata = []
-        self.index = None
+        self._epochs = np.empty(0, dtype='float64')
+        # Per-row namespace code, so near-duplicate checks search only their own namespace.
+        self._modes = np.empty(0, dtype='int32')
+        self._mode_codes: Dict[str, int] = {}
+        self._snap = _Snapshot({}, 0, self._epochs, self._modes)
+        self._dirty = set()
+        self._dirty_meta = set()
+        self.keyring = keyring
+        self._by_hash: Dict[str, int] = {}
         self.lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        self._persist_timer: Optional[threading.Timer] = None
         self._load()
 
-    def _initialize_index(self):
-        self.index = faiss.IndexIDMap(faiss.IndexFlatL2(self.dimension))
+    @property
+    def segments(self) -> Dict[str, _Segment]:
+        return self._snap.segments
+
+    @property
+    def ntotal(self) -> int:
+        return sum(seg.index.ntotal for seg in self._snap.segments.values())
+
+    def _new_index(self):
+        # IVF-PQ needs training data, so new segments start flat until a migration pass.
+        if self.index_type == "HNSW": return faiss.IndexIDMap(faiss.IndexHNSWFlat(self.dimension, HNSW_M))
+        return faiss.IndexIDMap(faiss.IndexFlatL2(self.dimension))
+
+    def _target_kind(self, rows: int) -> str:
+        if self.index_type == "IVF_PQ" and rows < IVF_PQ_MIN_ROWS: return "Flat"
+        return self.index_type
+
+    def _build_index(self, vectors: np.ndarray, ids: np.ndarray, kind: str, trained=None):
+        """Fresh IDMap'd index of `kind` over (vectors, ids); `trained` reuses an IVF-PQ's codebooks."""
+        if kind == "IVF_PQ" and ids.size < IVF_PQ_MIN_ROWS: kind = "Flat"
+        if kind == "HNSW":
+            inner = faiss.IndexHNSWFlat(self.dimension, HNSW_M)
+        elif kind == "IVF_PQ":
+            if trained is not None:
+                inner = faiss.clone_index(trained)
+                inner.reset()
+            else:
+                inner = train_ivfpq(vectors, self.dimension)
+                inner.nprobe = IVF_PQ_NPROBE
+            # Rows must stay reconstructable for tier moves, exports and rebuilds.
+            inner.make_direct_map()
+        else:
+            inner = faiss.IndexFlatL2(self.dimension)
+        index = faiss.IndexIDMap(inner)
+        if ids.size: index.add_with_ids(np.ascontiguousarray(vectors, dtype='float32'), ids)
+        return index
+
+    def _without(self, seg: _Segment, doomed: np.ndarray) -> _Segment:
+        """Copy of `seg` minus the `doomed` row ids."""
+        if seg.kind == "Flat":
+            seg = seg.cloned()
+            seg.index.remove_ids(doomed)
+            return seg
+        # HNSW cannot delete and IVF renumbers under the id map: rebuild from the survivors.
+        ids = seg.ids()
+        keep = ~np.isin(ids, doomed)
+        trained = faiss.downcast_index(seg.index.index) if seg.kind == "IVF_PQ" else None
+        return _Segment(seg.key, self._build_index(seg.vectors()[keep], ids[keep], seg.kind, trained), seg.min_t, seg.max_t)
+
+    def _pending_migrations(self, segments: Dict[str, _Segment], keys=None) -> List[str]:
+        """Segments (with their deltas) whose index kind is not the configured one for their size."""
+        keys = segments if keys is None else {k.partition("+")[0] for k in keys} & segments.keys()
+        return [key for key in keys if "+" not in key and segments[key].kind != self._target_kind(self._rows_under(segments, key))]
+
+    def migrate_index(self, index_type: Optional[str] = None) -> int:
+        """
+        Converts every segment to `index_type` (default: the configured one). Each segment
+        is rebuilt outside the lock and swapped in only if no writer replaced it meanwhile,
+        so recall and ingest keep running; skipped segments are picked up by the next pass.
+        Leaving IVF_PQ keeps the quantized vectors; re-index to restore full precision.
+        A segment's deltas are folded into the rebuilt index.
+        """
+        if index_type is not None: self.index_type = getattr(index_type, "value", index_type)
+        migrated = 0
+        for key in self._pending_migrations(self._snap.segments):
+            current = self._snap.segments
+            if key not in current: continue
+            parts = [current[k] for k in [key] + self._deltas(current, key)]
+            ids = np.concatenate([p.ids() for p in parts])
+            index = self._build_index(np.vstack([p.vectors() for p in parts]), ids, self._target_kind(ids.size))
+            with self.lock:
+                current = self._snap.segments
+                if self._closed or [current.get(k) for k in [key] + self._deltas(current, key)] != parts: continue
+                segments = dict(current)
+                for p in parts[1:]: del segments[p.key]
+                segments[key] = _Segment(key, index, min(p.min_t for p in parts), max(p.max_t for p in parts))
+                self._dirty |= {p.key for p in parts}
+                self._publish(segments, self._snap.n)
+            migrated += 1
+        if migrated:
+            self._persist()
+            self.log.info(f"[SynthMemory: VectorStore] Migrated {migrated} segment(s) to {self.index_type}.")
+        return migrated
+
+    def schedule_migration(self, index_type: Optional[str] = None):
+        """Runs migrate_index on a background thread; a pass already running re-checks when done."""
+        if index_type is not None: self.index_type = getattr(index_type, "value", index_type)
+        with self.lock:
+            self._migration_requested = True
+            if self._migrating: return
+            self._migrating = True
+        threading.Thread(target=self._migration_loop, daemon=True).start()
+
+    def _migration_loop(self):
+        while True:
+            with self.lock:
+                if not self._migration_requested or self._closed:
+                    self._migrating = False
+                    return
+                self._migration_requested = False
+            try:
+                self.migrate_index()
+            except Exception as e:
+                self.log.error(f"[SynthMemory: VectorStore] Index migration to {self.index_type} failed: {e}")
+
+    def _window_key(self, epoch: float) -> str:
+        dt = datetime.fromtimestamp(epoch)
+        if self.segment_window == "day": return dt.strftime("%Y-%m-%d")
+        if self.segment_window == "month": return dt.strftime("%Y-%m")
+        year, week, _ = dt.isocalendar()
+        return f"{year}-W{week:02d}"
+
+    @staticmethod
+    def _meta_epoch(meta: Dict) -> float:
+        try:
+            return datetime.fromisoformat(meta["ts"]).timestamp()
+        except (KeyError, TypeError, ValueError):
+            return 0.0
+
+    def epochs(self) -> np.ndarray:
+        """Float64 view of each row's insertion time, indexed by row id."""
+        return self._snap.epochs
+
+    def _mode_code(self, mode: Optional[str]) -> int:
+        if mode is None: return -1
+        return self._mode_codes.setdefault(mode, len(self._mode_codes))
 
-    def add(self, vectors: np.ndarray, metas: List[Dict]):
+    def _append_rows(self, n: int, epochs: np.ndarray, modes: np.ndarray):
+        # Amortized O(1) growth. Only slots past `n` are written, so published views stay valid.
+        need = n + epochs.size
+        if need > self._epochs.size:
+            size = max(need, 2 * self._epochs.size, 1024)
+            grown, grown_modes = np.empty(size, dtype='float64'), np.empty(size, dtype='int32')
+            grown[:n], grown_modes[:n] = self._epochs[:n], self._modes[:n]
+            self._epochs, self._modes = grown, grown_modes
+        self._epochs[n:need] = epochs
+        self._modes[n:need] = modes
+
+    def _publish(self, segments: Dict[str, _Segment], n: int):
+        self._snap = _Snapshot(segments, n, self._epochs, self._modes)
+
+    def _seal(self, meta: Dict) -> Dict:
+        if not self.keyring or "text" not in meta: return meta
+        sealed = dict(meta)
+        kid, token = self.keyring.encrypt(sealed.pop("text"), sealed.get("mode", "default"))
+        sealed["kid"], sealed["text_enc"] = kid, token
+        return sealed
+
+    def _open(self, hits: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return open_sealed_hits(self.keyring, hits)
+
+    @staticmethod
+    def _deltas(segments: Dict[str, _Segment], key: str) -> List[str]:
+        """Delta segments (`<key>+<n>`) holding rows written to `key` after it was published."""
+        return sorted((k for k in segments if k.startswith(key + "+")), key=lambda k: int(k.rpartition("+")[2]))
+
+    def _rows_under(self, segments: Dict[str, _Segment], key: str) -> int:
+        main = segments[key].index.ntotal if key in segments else 0
+        return main + sum(segments[d].index.ntotal for d in self._deltas(segments, key))
+
+    def _active_key(self, segments: Dict[str, _Segment], window: str) -> str:
+        keys = [k for k in segments if "+" not in k and (k == window or k.startswith(window + "."))]
+        if not keys: return window
+        last = max(keys, key=lambda k: int(k.rpartition(".")[2]) if "." in k else 0)
+        if self._rows_under(segments, last) < self.max_segment_rows: return last
+        return f"{window}.{int(last.rpartition('.')[2]) + 1 if '.' in last else 1}"
+
+    def _insert(self, segments: Dict[str, _Segment], vectors: np.ndarray, ids: np.ndarray, epochs: np.ndarray, cow: bool = True) -> set:
+        """
+        Insert into `segments`, a private copy of the published mapping. Published segments
+        are never written: their new rows go to a fresh delta segment, so an insert costs
+        the rows it adds rather than a copy of the segment. `cow=False` is for mappings no
+        reader can see and appends in place. Returns the keys added, changed or removed.
+        """
+        touched, private = set(), set()
+        keys = np.array([self._window_key(t) for t in epochs])
+        for window in dict.fromkeys(keys.tolist()):
+            rows = np.nonzero(keys == window)[0]
+            while rows.size:
+                key = self._active_key(segments, window)
+                room = self.max_segment_rows - self._rows_under(segments, key)
+                take, rows = rows[:room], rows[room:]
+                target = key
+                if cow and key in segments and key not in private:
+                    deltas = self._deltas(segments, key)
+                    if deltas and deltas[-1] in private: target = deltas[-1]
+                    else: target = f"{key}+{int(deltas[-1].rpartition('+')[2]) + 1 if deltas else 1}"
+                seg = segments.get(target)
+                if seg is None:
+                    seg = segments[target] = _Segment(target, self._new_index())
+                    private.add(target)
+                seg.index.add_with_ids(vectors[take], ids[take])
+                seg.widen(epochs[take])
+                touched.add(target)
+        for key in {k.partition("+")[0] for k in touched if "+" in k}:
+            touched |= self._merge_deltas(segments, key)
+        return touched
+
+    def _merge_deltas(self, segments: Dict[str, _Segment], key: str) -> set:
+        """
+        Once DELTA_MAX_SEGMENTS deltas of `key` exist they are merged: into one larger delta
+        while they hold under a quarter of the segment's rows, else into a copy of the segment
+        itself. Each row is thus copied a bounded number of times per segment fill. A full
+        segment takes in its deltas right away, as no further writes would trigger the merge.
+        """
+        deltas = self._deltas(segments, key)
+        if not deltas: return set()
+        full = self._rows_under(segments, key) >= self.max_segment_rows
+        if len(deltas) < DELTA_MAX_SEGMENTS and not full: return set()
+        rows = sum(segments[d].index.ntotal for d in deltas)
+        main = segments.get(key)
+        if main is not None and not full and 4 * rows < main.index.ntotal:
+            target = f"{key}+{int(deltas[-1].rpartition('+')[2]) + 1}"
+            merged = _Segment(target, self._new_index())
+        else:
+            target = key
+            merged = main.cloned() if main is not None else _Segment(key, self._new_index())
+        for d in deltas:
+            seg = segments.pop(d)
+            merged.index.add_with_ids(seg.vectors(), seg.ids())
+            merged.widen(np.array([seg.min_t, seg.max_t]))
+        segments[target] = merged
+        return set(deltas) | {target}
+
+    def add(self, vectors: np.ndarray, metas: List[Dict], persist: bool = True):
+        metas = [self._seal(m) for m in metas]
         with self.lock:
             assert vectors.shape[1] == self.dimension, "Embedding vector shape mismatch"
-            start_id = len(self.metadata)
+            start_id = self._snap.n
             ids = np.arange(start_id, start_id + vectors.shape[0]).astype('int64')
-            self.index.add_with_ids(vectors.astype('float32'), ids)
+            epochs = np.array([self._meta_epoch(m) for m in metas], dtype='float64')
+            segments = dict(self._snap.segments)
+            touched = self._insert(segments, vectors.astype('float32'), ids, epochs)
+            self._dirty |= touched
+            self._append_rows(start_id, epochs, np.array([self._mode_code(m.get("mode")) for m in metas], dtype='int32'))
             self.metadata.extend(metas)
-            self._save()
+            self._dirty_meta.update(range(start_id // META_CHUNK_ROWS, (start_id + len(metas) - 1) // META_CHUNK_ROWS + 1))
+            for i, m in enumerate(metas, start=start_id):
+                if "hash" in m: self._by_hash[m["hash"]] = i
+            self._publish(segments, start_id + len(metas))
+            # Active segments become trainable as they fill; convert them in the background.
+            grown = self.index_type == "IVF_PQ" and bool(self._pending_migrations(segments, touched))
+        if persist: self._persist()
+        if grown: self.schedule_migration()
+
+    def flush(self):
+        """Persists writes made with `persist=False` (bulk loads)."""
+        self._persist()
+
+    def iter_rows(self, chunk_rows: int = 4096):
+        """
+        Streams (ids, vectors, metas) of every indexed row from the current snapshot,
+        one segment slice at a time, so exports never hold more than `chunk_rows` vectors.
+        """
+        snap = self._snap
+        for key in sorted(snap.segments):
+            seg = snap.segments[key]
+            ids = seg.ids()
+            for start in range(0, ids.size, chunk_rows):
+                chunk = ids[start:start + chunk_rows]
+                yield chunk, seg.index.index.reconstruct_n(start, chunk.size), [self.metadata[i] for i in chunk.tolist()]
+
+    def memory_ids(self):
+        """Memory ids of every row ever stored, tombstones included; reads metadata only."""
+        metadata = self.metadata[:self._snap.n]
+        return (m["id"] for m in metadata if "id" in m)
+
+    def _search_segments(self, snap: _Snapshot, q: np.ndarray, k: int, since: Optional[float] = None, as_of: Optional[float] = None, mode: Optional[int] = None) -> List[Tuple[float, int]]:
+        lo = since if since is not None else float("-inf")
+        hi = as_of if as_of is not None else float("inf")
+        found = []
+        for seg in snap.segments.values():
+            if seg.index.ntotal == 0 or seg.max_t < lo or seg.min_t > hi: continue
+            inside = seg.min_t >= lo and seg.max_t <= hi
+            if inside and mode is None:
+                distances, indices = seg.index.search(q, k)
+            else:
+                # Boundary segment or namespace-scoped search: restrict the scan to matching rows.
+                ids = seg.ids()
+                ids = ids[ids < snap.n]
+                keep = np.ones(ids.size, dtype=bool)
+                if not inside:
+                    ts = snap.epochs[ids]
+                    keep &= (ts >= lo) & (ts <= hi)
+                if mode is not None: keep &= snap.modes[ids] == mode
+                allowed = ids[keep]
+                if allowed.size == 0: continue
+                distances, indices = seg.index.search(q, k, params=seg.search_params(faiss.IDSelectorBatch(allowed)))
+            found.extend((float(d), int(i)) for d, i in zip(distances[0], indices[0]) if i != -1)
+        found.sort()
+        return found[:k]
+
+    def search(self, query_vector: np.ndarray, k: int = 5, since=None, as_of=None) -> List[Dict[str, Any]]:
+        since, as_of = to_epoch(since), to_epoch(as_of)
+        assert query_vector.shape[0] == self.dimension, "Query vector shape mismatch"
+        snap = self._snap
+        q = query_vector.astype('float32').reshape(1, -1)
+        results = []
+        for dist, idx in self._search_segments(snap, q, k, since, as_of):
+            if idx >= len(self.metadata): continue
+            meta = self.metadata[idx]
+            # Evicted after this snapshot was taken: the row is gone for newer readers too.
+            if "evicted" in meta: continue
+            results.append({
+                "metadata": dict(meta),
+                "score": dist,
+                "rank": len(results) + 1,
+                "epoch": float(snap.epochs[idx])
+            })
+        return self._open(results)
+
+    def shred_namespace(self, namespace: str) -> int:
+        """
+        CryptoShred: destroys the namespace data keys, then drops the rows sealed under them
+        from the index so they no longer take top-k slots. Returns the number of keys destroyed.
+        """
+        if not self.keyring:
+            self.log.warning("[SynthMemory: VectorStore] CryptoShred requested but no keyring is configured.")
+            return 0
+        shredded = self.keyring.shred(namespace)
+        code = self._mode_codes.get(namespace)
+        if shredded and code is not None:
+            rows = [int(i) for i in np.nonzero(self._snap.modes == code)[0]
+                    if "kid" in self.metadata[i] and not self._is_live(self.metadata[i])]
+            self.drop_rows(rows, reason="shredded")
+        return shredded
+
+    def fingerprint(self, text: str, namespace: str) -> str:
+        """Content hash used for exact dedup; keyed per namespace when encryption is on."""
+        if self.keyring: return self.keyring.fingerprint(text, namespace)
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    def _is_live(self, meta: Dict) -> bool:
+        if "evicted" in meta: return False
+        return "kid" not in meta or (self.keyring is not None and self.keyring.is_live(meta["kid"]))
+
+    def find_exact(self, content_hash: str, namespace: str) -> Optional[int]:
+        idx = self._by_hash.get(content_hash)
+        if idx is None or idx >= len(self.metadata): return None
+        meta = self.metadata[idx]
+        return idx if meta.get("mode") == namespace and self._is_live(meta) else None
+
+    def find_near(self, vector: np.ndarray, namespace: str, k: int = 4) -> List[Tuple[int, float]]:
+        """Nearest live rows of the namespace as (row, squared L2 distance), closest first."""
+        code = self._mode_codes.get(namespace)
+        if code is None: return []
+        q = vector.astype('float32').reshape(1, -1)
+        out = []
+        for dist, idx in self._search_segments(self._snap, q, k, mode=code):
+            if idx >= len(self.metadata): continue
+            meta = self.metadata[idx]
+            if self._is_live(meta): out.append((idx, dist))
+        return out
+
+    def reinforce(self, idx: int, ts: str, thresholds: Optional[Dict[str, int]] = None) -> Optional[Dict]:
+        """
+        Bumps the reinforcement counter of an existing row instead of inserting a duplicate.
+        `thresholds` maps a metadata flag to the count at which it is set (e.g. {"promoted": 3}).
+        """
+        with self.lock:
+            # An evicted row was archived or deleted after the caller found it; nothing to reinforce.
+            if idx >= self._snap.n or "evicted" in self.metadata[idx]: return None
+            meta = dict(self.metadata[idx])
+            meta["reinforcement"] = int(meta.get("reinforcement", 1)) + 1
+            meta["last_reinforced"] = ts
+            meta["last_reinforced_t"] = to_epoch(ts)
+            for flag, threshold in (thresholds or {}).items():
+                if meta["reinforcement"] >= threshold: meta[flag] = True
+            self.metadata[idx] = meta
+            self._dirty_meta.add(idx // META_CHUNK_ROWS)
+        self._persist_later()
+        return {k: v for k, v in meta.items() if k not in ("kid", "text_enc", "text")}
 
-    def search(self, query_vector: np.ndarray, k: int = 5) -> List[Dict[str, Any]]:
+    @staticmethod
+    def _movable(meta: Dict) -> bool:
+        return not meta.get("reinforced") and "evicted" not in meta
+
+    def eviction_candidates(self, cutoff_ts: str, max_rows: int) -> List[int]:
+        """
+        Rows that should leave the hot tier: unreinforced rows older than `cutoff_ts`,
+        plus the oldest unreinforced rows needed to bring the tier down to `max_rows`.
+        """
+        live = [i for seg in self._snap.segments.values() for i in seg.ids().tolist()]
+        movable = sorted((self.metadata[i].get("ts", ""), i) for i in live if self._movable(self.metadata[i]))
+        overflow = max(0, len(live) - max_rows)
+        return [i for n, (ts, i) in enumerate(movable) if n < overflow or ts < cutoff_ts]
+
+    def move_rows(self, rows: List[int], sink, reason: str) -> List[int]:
+        """
+        Drops the rows that are still movable, first handing their raw vectors and (still
+        sealed) metadata to `sink(rows, vectors, metas)` when given. Everything runs under
+        the write lock, so a reinforcement lands either before the rows are re-checked or
+        after they are tombstoned (and then finds nothing to reinforce). Returns the rows moved.
+        """
+        wanted = np.asarray(rows, dtype='int64')
+        with self.lock:
+            keep, vectors = [], []
+            for seg in self._snap.segments.values():
+                ids = seg.ids()
+                for pos in np.nonzero(np.isin(ids, wanted))[0]:
+                    if not self._movable(self.metadata[int(ids[pos])]): continue
+                    keep.append(int(ids[pos]))
+                    if sink is not None: vectors.append(seg.index.index.reconstruct(int(pos)))
+            if not keep: return []
+            if sink is not None: sink(keep, np.vstack(vectors), [dict(self.metadata[r]) for r in keep])
+            self._drop(keep, reason)
+        self._persist()
+        return keep
+
+    def _drop(self, rows: List[int], reason: str):
+        """Removes rows from the index, leaving a small tombstone so row ids stay stable (hold `lock`)."""
+        doomed = np.asarray(rows, dtype='int64')
+        segments = dict(self._snap.segments)
+        for key, seg in list(segments.items()):
+            if not np.isin(seg.ids(), doomed).any(): continue
+            seg = self._without(seg, doomed)
+            if seg.index.ntotal: segments[key] = seg
+            else: del segments[key]
+            self._dirty.add(key)
+        for r in rows:
+            old = self.metadata[r]
+            tomb = {k: old[k] for k in ("id", "mode", "ts", "hash") if k in old}
+            tomb["evicted"] = reason
+            self.metadata[r] = tomb
+            self._dirty_meta.add(r // META_CHUNK_ROWS)
+        self._publish(segments, self._snap.n)
+
+    def drop_rows(self, rows: List[int], reason: str):
+        """Removes rows from the index, leaving a small tombstone so row ids stay stable."""
+        if not rows: return
         with self.lock:
-            assert query_vector.shape[0] == self.dimension, "Query vector shape mismatch"
-            if self.index.ntotal == 0: return []
-            q = query_vector.astype('float32').reshape(1, -1)
-            distances, indices = self.index.search(q, k)
-            results = []
-            for rank, (dist, idx) in enumerate(zip(distances[0], indices[0])):
-                if idx != -1 and idx < len(self.metadata):
-                    results.append({
-                        "metadata": self.metadata[idx],
-                        "score": float(dist),
-                        "rank": rank + 1
-                    })
-            return results
-
-    def _save(self):
+            self._drop(rows, reason)
+        self._persist()
+
+    # --- Re-embedding support (see store/reindex.py) ---------------------------------
+    @property
+    def reindex_file(self) -> Path:
+        return self.index_dir / "reindex.json"
+
+    def request_reindex(self):
+        """Schedules a re-embedding of every stored row; picked up by ReindexPipeline."""
+        if self.reindex_file.exists() or not self.metadata: return
         self.index_dir.mkdir(parents=True, exist_ok=True)
-        faiss.write_index(self.index, str(self.idx_file))
-        with open(self.meta_file, 'wb') as f:
-            pickle.dump(self.metadata, f)
+        with open(self.reindex_file, 'w') as f:
+            json.dump({"state": "pending", "dimension": self.dimension, "target_rows": self._snap.n}, f)
+        self.log.warning(f"[SynthMemory: VectorStore] Scheduled re-embedding of {self._snap.n} rows at dimension {self.dimension}.")
 
-    def _load(self):
-        if self.idx_file.exists() and self.meta_file.exists():
-            self.index = faiss.read_index(str(self.idx_file))
+    def source_rows(self, start: int, stop: int) -> List[Tuple[int, str]]:
+        """Plaintext of live rows in [start, stop), decrypted in one batch."""
+        rows = [(i, self.metadata[i]) for i in range(start, min(stop, self._snap.n))]
+        return plaintext_rows(self.keyring, [(i, m) for i, m in rows if "evicted" not in m])
+
+    def adopt_segments(self, staged: Dict[str, _Segment], target_rows: int):
+        """
+        Atomically replaces the index with re-embedded segments covering rows < `target_rows`.
+        Rows evicted or shredded while the re-index ran are left out; rows ingested meanwhile
+        are carried over from the live segments.
+        """
+        with self.lock:
+            for key, seg in list(staged.items()):
+                ids = seg.ids()
+                dead = np.array([i for i in ids.tolist() if not self._is_live(self.metadata[i])], dtype='int64')
+                if dead.size == 0: continue
+                seg = self._without(seg, dead)
+                if seg.index.ntotal: staged[key] = seg
+                else: del staged[key]
+            for seg in self._snap.segments.values():
+                ids = seg.ids()
+                pos = np.nonzero(ids >= target_rows)[0]
+                if pos.size == 0: continue
+                vectors = np.vstack([seg.index.index.reconstruct(int(p)) for p in pos])
+                self._insert(staged, vectors, ids[pos], self._snap.epochs[ids[pos]], cow=False)
+            self._dirty |= set(staged) | set(self._snap.segments)
+            self._publish(staged, self._snap.n)
+        self._persist()
+
+    def _segment_file(self, key: str) -> Path:
+        return self.seg_dir / f"{key}.index"
+
+    def _persist(self):
+        """Writes the latest snapshot: changed metadata chunks, then dirty segments, each via atomic rename."""
+        with self._io_lock:
+            with self.lock:
+                snap, dirty, self._dirty = self._snap, self._dirty, set()
+                chunks = {c: self.metadata[c * META_CHUNK_ROWS:min((c + 1) * META_CHUNK_ROWS, snap.n)] for c in sorted(self._dirty_meta)}
+                self._dirty_meta = set()
+            # Metadata first: a crash before the segments land leaves extra metadata, never dangling ids.
+            self._save_meta(chunks)
+            self.seg_dir.mkdir(parents=True, exist_ok=True)
+            for key in dirty:
+                path = self._segment_file(key)
+                seg = snap.segments.get(key)
+                if seg is None:
+                    path.unlink(missing_ok=True)
+                    continue
+                tmp = path.with_suffix(".tmp")
+                faiss.write_index(seg.index, str(tmp))
+                os.replace(tmp, path)
+
+    def _persist_later(self):
+        """Coalesces metadata-only updates (reinforcement) into one persist PERSIST_DELAY_S later."""
+        with self.lock:
+            if self._persist_timer is not None or self._closed: return
+            self._persist_timer = threading.Timer(PERSIST_DELAY_S, self._deferred_persist)
+            self._persist_timer.daemon = True
+            self._persist_timer.start()
+
+    def _deferred_persist(self):
+        with self.lock:
+            self._persist_timer = None
+        self._persist()
+
+    def _meta_chunk_file(self, chunk: int) -> Path:
+        return self.meta_dir / f"{chunk:06d}.pkl"
+
+    def _save_meta(self, chunks: Dict[int, List[Dict]]):
+        # Ascending order, so a crash can only cut the list short, never leave a hole.
+        self.meta_dir.mkdir(parents=True, exist_ok=True)
+        for chunk, rows in sorted(chunks.items()):
+            path = self._meta_chunk_file(chunk)
+            tmp = path.with_suffix(".tmp")
+            with open(tmp, 'wb') as f:
+                pickle.dump(rows, f, protocol=4)
+            os.replace(tmp, path)
+
+    def _load_meta(self) -> List[Dict]:
+        """Concatenates the metadata chunks, first splitting up a single-file vector.meta (left by IncrementalBackup.restore or the pre-segmentation store)."""
+        if self.meta_file.exists():
             with open(self.meta_file, 'rb') as f:
-                self.metadata = pickle.load(f)
-            if self.index.d != self.dimension:
-                self.log.error(f"[SynthMemory: VectorStore] Dimension mismatch: Expected {self.dimension}, got {self.index.d}. Renaming corrupted index.")
-                backup_file = self.index_dir / f"vector_mismatch_{datetime.now().strftime('%Y%m%d%H%M%S')}.bak"
-                self.idx_file.rename(backup_file)
-                self._initialize_index()
-        else:
-            self._initialize_index()
+                metadata = pickle.load(f)
+            shutil.rmtree(self.meta_dir, ignore_errors=True)
+            self._save_meta({c: metadata[s:s + META_CHUNK_ROWS] for c, s in enumerate(range(0, len(metadata), META_CHUNK_ROWS))})
+            self.meta_file.unlink()
+            return metadata
+        metadata, chunk = [], 0
+        while self._meta_chunk_file(chunk).exists():
+            with open(self._meta_chunk_file(chunk), 'rb') as f:
+                rows = pickle.load(f)
+            metadata.extend(rows)
+            # A short chunk is the last one written; anything after it predates a crash.
+            if len(rows) < META_CHUNK_ROWS: break
+            chunk += 1
+        return metadata
+
+    def _migrate_legacy(self):
+        """Splits a pre-segmentation single vector.index into time-window segments."""
+        legacy = faiss.read_index(str(self.idx_file))
+        if legacy.d != self.dimension:
+            self.log.error(f"[SynthMemory: VectorStore] Dimension mismatch: Expected {self.dimension}, got {legacy.d}. Renaming corrupted index.")
+            backup_file = self.index_dir / f"vector_mismatch_{datetime.now().strftime('%Y%m%d%H%M%S')}.bak"
+            self.idx_file.rename(backup_file)
+            self.request_reindex()
+            return
+        segments = {}
+        if legacy.ntotal:
+            ids = faiss.vector_to_array(legacy.id_map)
+            vectors = legacy.index.reconstruct_n(0, legacy.ntotal)
+            self._dirty |= self._insert(segments, vectors, ids, self._snap.epochs[ids])
+        self._publish(segments, self._snap.n)
+        self._persist()
+        self.idx_file.unlink()
+        self.log.info(f"[SynthMemory: VectorStore] Migrated {legacy.ntotal} rows into {len(segments)} time segments.")
+
+    def _load(self):
+        legacy_meta = self.meta_file.exists()
+        if legacy_meta or self.meta_dir.exists():
+            self.metadata = self._load_meta()
+            self._epochs = np.array([self._meta_epoch(m) for m in self.metadata], dtype='float64')
+            self._modes = np.array([self._mode_code(m.get("mode")) for m in self.metadata], dtype='int32')
+            self._by_hash = {m["hash"]: i for i, m in enumerate(self.metadata) if "hash" in m}
+            self._publish({}, len(self.metadata))
+        if self.idx_file.exists() and legacy_meta:
+            self._migrate_legacy()
+            return
+        if not self.seg_dir.exists(): return
+        segments = {}
+        for path in sorted(self.seg_dir.glob("*.index")):
+            index = faiss.read_index(str(path))
+            if index.d != self.dimension:
+                self.log.error(f"[SynthMemory: VectorStore] Dimension mismatch: Expected {self.dimension}, got {index.d}. Renaming corrupted segments.")
+                self.seg_dir.rename(self.index_dir / f"segments_mismatch_{datetime.now().strftime('%Y%m%d%H%M%S')}.bak")
+                self.request_reindex()
+                return
+            seg = _Segment(path.stem, index)
+            ids = seg.ids()
+            dangling = ids[ids >= self._snap.n]
+            if dangling.size:
+                # Metadata is written first, but nothing is fsynced: after a power loss a segment can outlive the chunk written before it.
+                self.log.warning(f"[SynthMemory: VectorStore] Dropping {dangling.size} row(s) without metadata from segment {seg.key}.")
+                seg = self._without(seg, dangling)
+                ids = seg.ids()
+                self._dirty.add(seg.key)
+            seg.widen(self._snap.epochs[ids])
+            if seg.index.ntotal: segments[seg.key] = seg
+        self._publish(segments, self._snap.n)
 
     def get_dimension(self):
         return self.dimension
@@ -113,3 +829,7 @@ class FAISSVectorStore:
             if self._closed: return
             # FAISS indices do not strictly require closing, but we flush state here
             self._closed = True
+            timer, self._persist_timer = self._persist_timer, None
+        if timer is not None:
+            timer.cancel()
+            self._persist()
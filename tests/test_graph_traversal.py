@@ -0,0 +1,30 @@
+import pytest
+from datetime import datetime, timedelta
+
+pytest.importorskip("kuzu")
+
+from ..store.graph_store import KuzuGraphStore
+
+@pytest.fixture
+def graph(tmp_path):
+    gs = KuzuGraphStore(tmp_path / "graph", buffer_pool_gb=1)
+    yield gs
+    gs.close()
+
+def test_temporal_traversal_follows_member_of_and_prunes_expired_edges(graph):
+    for eid in ("a", "b", "c", "d"):
+        graph.upsert_entity(eid, eid.upper(), "Thing")
+    graph.conn.execute("CREATE (:Community {id: 1, summary: 'team'})")
+    for eid in ("a", "b", "c", "d"):
+        graph.conn.execute("MATCH (e:Entity {id: $id}), (c:Community {id: 1}) CREATE (e)-[:MemberOf]->(c)", {"id": eid})
+    graph.add_relation("a", "c", "knows")
+    graph.add_relation("a", "d", "knows")
+    past = (datetime.now() - timedelta(days=1)).isoformat()
+    graph.conn.execute("MATCH (:Entity {id: 'a'})-[r:RelatedTo]->(:Entity {id: 'd'}) SET r.valid_to = timestamp($ts)", {"ts": past})
+
+    # One hop only crosses RelatedTo edges: the expired a->d edge is pruned.
+    direct = {row["id"] for row in graph.traverse_bounded("a", depth=1)}
+    assert direct == {"c"}
+    assert {row["id"] for row in graph.traverse_bounded("a", depth=1, temporal=False)} == {"c", "d"}
+    # a -MemberOf-> community <-MemberOf- b: reached only through MemberOf edges.
+    assert "b" in {row["id"] for row in graph.traverse_bounded("a", depth=2)}
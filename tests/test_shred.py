@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+from datetime import datetime
+
+faiss = pytest.importorskip("faiss")
+pytest.importorskip("cryptography")
+
+from ..store.vector_store import FAISSVectorStore
+from ..store.cold_store import ColdArchive
+from ..utils.encryption import NamespaceKeyring
+
+DIM = 16
+
+def _rows(rng, n, mode, center):
+    vectors = (center + 0.01 * rng.standard_normal((n, DIM))).astype('float32')
+    ts = datetime.now().isoformat()
+    return vectors, [{"id": f"{mode}-{i}", "text": f"{mode} memory {i}", "mode": mode, "ts": ts} for i in range(n)]
+
+@pytest.fixture
+def keyring(tmp_path, monkeypatch):
+    monkeypatch.delenv("SY_ENCRYPTION_KEY", raising=False)
+    return NamespaceKeyring(tmp_path / "keys.json", master_file=tmp_path / "master.key")
+
+def test_shredded_namespace_does_not_crowd_hot_recall(tmp_path, keyring):
+    rng = np.random.default_rng(0)
+    vs = FAISSVectorStore(tmp_path / "vector", DIM, keyring=keyring)
+    query = np.zeros(DIM, dtype='float32')
+    # The shredded namespace sits right on the query; the survivor is further away.
+    vs.add(*_rows(rng, 200, "doomed", query))
+    vs.add(*_rows(rng, 20, "kept", query + 1.0))
+    assert vs.shred_namespace("doomed") == 1
+    hits = vs.search(query, k=5)
+    assert len(hits) == 5
+    assert all(h["metadata"]["mode"] == "kept" for h in hits)
+    vs.close()
+
+def test_shredded_namespace_does_not_crowd_cold_recall(tmp_path, keyring):
+    rng = np.random.default_rng(1)
+    vs = FAISSVectorStore(tmp_path / "vector", DIM, keyring=keyring)
+    # Probe every list, so only the shredded-row filter decides what comes back.
+    cold = ColdArchive(tmp_path / "cold", DIM, keyring=keyring, code_bytes=8, min_train_rows=256, nprobe=64)
+    query = np.zeros(DIM, dtype='float32')
+    doomed, doomed_meta = _rows(rng, 300, "doomed", query)
+    kept, kept_meta = _rows(rng, 20, "kept", query + 1.0)
+    cold.append(np.vstack([doomed, kept]), [vs._seal(m) for m in doomed_meta + kept_meta])
+    keyring.shred("doomed")
+    hits = cold.search(query, k=5)
+    assert len(hits) == 5
+    assert all(h["metadata"]["mode"] == "kept" for h in hits)
+    cold.close()
+    vs.close()
@@ -1,4 +1,5 @@
 import asyncio
+import threading
 from concurrent.futures import ThreadPoolExecutor
 from typing import Callable, Any
 
@@ -8,8 +9,22 @@ class CPUExecutor:
     Ensures the Py-GPT main thread (GUI) remains responsive.
     """
     def __init__(self, max_workers: int = 4):
+        self.max_workers = max_workers
         self.pool = ThreadPoolExecutor(max_workers=max_workers)
+        # Submission and the pool swap are atomic to each other, so nothing lands on a shut-down pool.
+        self._lock = threading.Lock()
+
+    def resize(self, max_workers: int):
+        """Swaps in a pool of the new size; work queued on the old pool still completes."""
+        with self._lock:
+            if max_workers == self.max_workers: return
+            old, self.pool = self.pool, ThreadPoolExecutor(max_workers=max_workers)
+            self.max_workers = max_workers
+            old.shutdown(wait=False)
 
     async def run(self, func: Callable, *args, **kwargs) -> Any:
         loop = asyncio.get_running_loop()
-        return await loop.run_in_executor(self.pool, lambda: func(*args, **kwargs))
\ No newline at end of file
+        with self._lock:
+            # run_in_executor submits right away; only the wait happens outside the lock.
+            fut = loop.run_in_executor(self.pool, lambda: func(*args, **kwargs))
+        return await fut
\ No newline at end of file
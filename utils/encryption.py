@@ -1,26 +1,238 @@
 import os
+import json
+import hmac
+import hashlib
+import uuid
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, List, Dict, Tuple, Sequence
 try:
     from cryptography.hazmat.primitives.ciphers.aead import ChaCha20Poly1305
 except ImportError:
     ChaCha20Poly1305 = None
 
+class KeyringError(RuntimeError):
+    """Stored data keys cannot be opened, typically because the master key changed."""
+
+def load_master_key(master_file: Path) -> Tuple[bytes, bool]:
+    """
+    Master key for envelope encryption: SY_ENCRYPTION_KEY (at least 32 bytes) when set,
+    otherwise a random key generated once and kept in `master_file` (mode 600).
+    Returns (key, created).
+    """
+    env = os.getenv("SY_ENCRYPTION_KEY")
+    if env:
+        key = env.encode()
+        if len(key) < 32: raise KeyringError("SY_ENCRYPTION_KEY must be at least 32 bytes.")
+        return key[:32], False
+    if master_file.exists():
+        key = master_file.read_bytes()
+        if len(key) != 32: raise KeyringError(f"{master_file} does not hold a 32-byte key.")
+        return key, False
+    master_file.parent.mkdir(parents=True, exist_ok=True)
+    key = os.urandom(32)
+    fd = os.open(master_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, 'wb') as f:
+        f.write(key)
+    return key, True
+
 class EncryptionManager:
     """
     Optimized Encryption for Arch Linux.
     ChaCha20-Poly1305 is chosen for blazing fast software performance without AES-NI.
     """
-    def __init__(self):
-        key = os.getenv("SY_ENCRYPTION_KEY", "").encode().ljust(32, b'0')[:32]
+    def __init__(self, key: Optional[bytes] = None):
+        if key is None:
+            key = os.getenv("SY_ENCRYPTION_KEY", "").encode()[:32]
+        # Never pad a short key: an unset or short SY_ENCRYPTION_KEY gets an ephemeral random key.
         if len(key) < 32:
             key = os.urandom(32)
         self.cipher = ChaCha20Poly1305(key) if ChaCha20Poly1305 else None
 
     def encrypt(self, data: str) -> bytes:
-        if not self.cipher: return data.encode()
-        nonce = os.urandom(12)
-        return nonce + self.cipher.encrypt(nonce, data.encode(), None)
+        return self.encrypt_bytes(data.encode())
 
     def decrypt(self, token: bytes) -> str:
-        if not self.cipher: return token.decode()
+        return self.decrypt_bytes(token).decode()
+
+    def encrypt_bytes(self, data: bytes) -> bytes:
+        if not self.cipher: return data
+        nonce = os.urandom(12)
+        return nonce + self.cipher.encrypt(nonce, data, None)
+
+    def decrypt_bytes(self, token: bytes) -> bytes:
+        if not self.cipher: return token
         nonce, payload = token[:12], token[12:]
-        return self.cipher.decrypt(nonce, payload, None).decode()
\ No newline at end of file
+        return self.cipher.decrypt(nonce, payload, None)
+
+class NamespaceKeyring:
+    """
+    Envelope encryption for memory text at rest.
+    Every namespace (host mode) owns a random data key that is only ever persisted
+    wrapped by the master key. Shredding a namespace destroys its data keys, so the
+    rows written under them become unreadable without rewriting the vector index.
+    """
+    def __init__(self, key_file: Path, master: Optional[EncryptionManager] = None, cache_size: int = 16, master_file: Optional[Path] = None):
+        self.key_file = key_file
+        self.master = master
+        self.master_file = master_file or key_file.with_name("master.key")
+        self.cache_size = max(1, int(cache_size))
+        self.log = logging.getLogger("SynthMemory")
+        self.lock = threading.Lock()
+        # kid -> (raw data key, cipher); bounded LRU of unwrapped keys
+        self._cache: "OrderedDict[str, Tuple[bytes, EncryptionManager]]" = OrderedDict()
+        self._active: Dict[str, str] = {}
+        self._wrapped: Dict[str, Dict[str, str]] = {}
+        # Ids of destroyed keys, so importing an older export cannot bring them back.
+        self._shredded: set = set()
+        if ChaCha20Poly1305 is None:
+            self.log.warning("[SynthMemory: Keyring] cryptography not available. Memory text is stored unencrypted and CryptoShred only hides rows from recall.")
+        self._load()
+        if master is None:
+            # A fresh master key could never open keys that are already wrapped; do not create one next to them.
+            if self._wrapped and not os.getenv("SY_ENCRYPTION_KEY") and not self.master_file.exists():
+                raise KeyringError(f"{self.master_file} is missing but {self.key_file} holds wrapped data keys. Restore the master key or set SY_ENCRYPTION_KEY.")
+            key, created = load_master_key(self.master_file)
+            self.master = EncryptionManager(key)
+            if created:
+                self.log.info(f"[SynthMemory: Keyring] Generated a master key in {self.master_file}. Keep it; data keys cannot be opened without it.")
+        self._check_master()
+
+    def _load(self):
+        if not self.key_file.exists(): return
+        with open(self.key_file) as f:
+            data = json.load(f)
+        self._active = data.get("namespaces", {})
+        self._wrapped = data.get("keys", {})
+        self._shredded = set(data.get("shredded", []))
+
+    def _check_master(self):
+        """Refuses to open a keyring whose data keys the master key cannot unwrap."""
+        if not self._wrapped: return
+        kid = next(iter(self._active.values()), None) or next(iter(self._wrapped))
+        if self._unwrap(kid) is None:
+            raise KeyringError(f"Cannot unwrap the data keys in {self.key_file} with the configured master key. Restore the original master key; rows sealed under these keys are unreadable without it.")
+
+    def _save(self):
+        self.key_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.key_file.with_suffix(".tmp")
+        with open(tmp, 'w') as f:
+            json.dump({"namespaces": self._active, "keys": self._wrapped, "shredded": sorted(self._shredded)}, f)
+        os.chmod(tmp, 0o600)
+        os.replace(tmp, self.key_file)
+
+    def _create_key(self, namespace: str) -> str:
+        kid = uuid.uuid4().hex[:16]
+        raw = os.urandom(32)
+        self._wrapped[kid] = {"namespace": namespace, "wrapped": self.master.encrypt_bytes(raw).hex()}
+        self._active[namespace] = kid
+        self._save()
+        self._remember(kid, raw)
+        return kid
+
+    def _remember(self, kid: str, raw: bytes) -> Tuple[bytes, EncryptionManager]:
+        entry = (raw, EncryptionManager(raw))
+        self._cache[kid] = entry
+        self._cache.move_to_end(kid)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return entry
+
+    def _unwrap(self, kid: str) -> Optional[Tuple[bytes, EncryptionManager]]:
+        if kid in self._cache:
+            self._cache.move_to_end(kid)
+            return self._cache[kid]
+        record = self._wrapped.get(kid)
+        if record is None: return None
+        try:
+            raw = self.master.decrypt_bytes(bytes.fromhex(record["wrapped"]))
+        except Exception as e:
+            self.log.error(f"[SynthMemory: Keyring] Failed to unwrap data key {kid}: {e}")
+            return None
+        return self._remember(kid, raw)
+
+    def _active_entry(self, namespace: str) -> Tuple[str, Tuple[bytes, EncryptionManager]]:
+        kid = self._active.get(namespace) or self._create_key(namespace)
+        entry = self._unwrap(kid)
+        # Rotating to a fresh key here would silently orphan every row sealed under the old one.
+        if entry is None:
+            raise KeyringError(f"Data key {kid} of namespace '{namespace}' cannot be unwrapped; refusing to replace it.")
+        return kid, entry
+
+    def encrypt(self, text: str, namespace: str) -> Tuple[str, bytes]:
+        """Returns (key id, ciphertext) for text sealed under the namespace data key."""
+        with self.lock:
+            kid, (_, cipher) = self._active_entry(namespace)
+        return kid, cipher.encrypt(text)
+
+    def decrypt_many(self, items: Sequence[Tuple[str, bytes]]) -> List[Optional[str]]:
+        """
+        Decrypts (key id, ciphertext) pairs, unwrapping each distinct key once.
+        Rows whose key was shredded or whose ciphertext fails authentication yield None.
+        """
+        with self.lock:
+            ciphers = {kid: self._unwrap(kid) for kid in {kid for kid, _ in items}}
+        out = []
+        for kid, token in items:
+            entry = ciphers.get(kid)
+            if entry is None:
+                out.append(None)
+                continue
+            try:
+                out.append(entry[1].decrypt(token))
+            except Exception:
+                out.append(None)
+        return out
+
+    def fingerprint(self, text: str, namespace: str) -> str:
+        """Keyed content hash; shredding the namespace also invalidates its fingerprints."""
+        with self.lock:
+            _, (raw, _) = self._active_entry(namespace)
+        return hmac.new(raw, text.encode(), hashlib.sha256).hexdigest()
+
+    def export_keys(self) -> Dict[str, Dict[str, str]]:
+        """Data keys as persisted (still wrapped by the master key), for bundling with an export."""
+        with self.lock:
+            return {kid: dict(rec) for kid, rec in self._wrapped.items()}
+
+    def import_keys(self, wrapped: Dict[str, Dict[str, str]]) -> int:
+        """
+        Adds wrapped data keys from an export so its sealed rows can be opened here.
+        Only works when both installations share the master key: raises KeyringError,
+        adding nothing, if any new key fails to unwrap. Keys shredded here are not
+        restored. Returns the number added.
+        """
+        with self.lock:
+            fresh = {kid: rec for kid, rec in wrapped.items() if kid not in self._wrapped and kid not in self._shredded}
+            for kid, rec in fresh.items():
+                try:
+                    self.master.decrypt_bytes(bytes.fromhex(rec["wrapped"]))
+                except Exception:
+                    raise KeyringError(f"Data key {kid} of the export cannot be unwrapped with this installation's master key; the export was sealed under a different one.")
+            self._wrapped.update(fresh)
+            if fresh: self._save()
+        return len(fresh)
+
+    def clear_cache(self):
+        """Forgets every unwrapped data key; the next use unwraps it again."""
+        with self.lock:
+            self._cache.clear()
+
+    def is_live(self, kid: str) -> bool:
+        return kid in self._wrapped
+
+    def shred(self, namespace: str) -> int:
+        """Destroys every data key of the namespace. Returns the number of keys destroyed."""
+        with self.lock:
+            doomed = [kid for kid, rec in self._wrapped.items() if rec.get("namespace") == namespace]
+            for kid in doomed:
+                del self._wrapped[kid]
+                self._cache.pop(kid, None)
+                self._shredded.add(kid)
+            self._active.pop(namespace, None)
+            if doomed: self._save()
+        if doomed:
+            self.log.info(f"[SynthMemory: Keyring] Crypto-shredded namespace '{namespace}' ({len(doomed)} key(s)).")
+        return len(doomed)